@@ -53,4 +53,36 @@
       formLogout.submit();
     })
   }
-})();
\ No newline at end of file
+})();
+
+(() => {
+  const searchInput = document.querySelector('.search-input[data-suggest-url]');
+
+  if (!searchInput || !searchInput.list) {
+    return;
+  }
+
+  const suggestionList = searchInput.list;
+  let lastQuery = '';
+
+  searchInput.addEventListener('input', async () => {
+    const query = searchInput.value.trim();
+
+    if (!query || query === lastQuery) {
+      return;
+    }
+
+    lastQuery = query;
+    const url = `${searchInput.dataset.suggestUrl}?q=${encodeURIComponent(query)}`;
+    const response = await fetch(url);
+
+    if (!response.ok || query !== lastQuery) {
+      return;
+    }
+
+    const data = await response.json();
+    suggestionList.replaceChildren(
+      ...data.results.map((result) => new Option(result.label))
+    );
+  });
+})();
@@ -0,0 +1,9 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached pages and counters are not rolled back with the test database
+    cache.clear()
+    yield
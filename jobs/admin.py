@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = 'id', 'name', 'status', 'attempts', 'run_at', 'updated_at',
+    list_display_links = 'id', 'name',
+    list_filter = 'status', 'name',
+    search_fields = 'id', 'name', 'key',
+    list_per_page = 10
+    ordering = '-id',
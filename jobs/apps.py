@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self, *args, **kwargs):
+        # Registers the @job functions declared in each app's jobs.py
+        autodiscover_modules('jobs')
+        super_ready = super().ready(*args, **kwargs)
+        return super_ready
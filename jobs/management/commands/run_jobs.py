@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch', type=int, default=100)
+        parser.add_argument(
+            '--sleep', type=float, default=1,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Runs the jobs that are due and exits'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            jobs = run_pending_jobs(options['batch'], options['workers'])
+
+            for job in jobs:
+                self.stdout.write(f'{job} after {job.attempts} attempt(s)')
+
+            if options['once']:
+                return
+
+            if not jobs:
+                time.sleep(options['sleep'])
@@ -0,0 +1,148 @@
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def job(name, max_attempts=3):
+    def decorator(func):
+        registry[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, run_at=None):
+    # Inserted in the caller's transaction, so a worker only sees the job
+    # once the data it refers to is committed
+    if name not in registry:
+        raise KeyError(f'Unknown job {name!r}')
+
+    _, max_attempts = registry[name]
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'max_attempts': max_attempts,
+        'run_at': run_at or timezone.now(),
+    }
+
+    if key is None:
+        queued_job = Job.objects.create(**fields)
+    else:
+        try:
+            with transaction.atomic():
+                queued_job, _ = Job.objects.get_or_create(key=key, defaults=fields)
+        except IntegrityError:
+            queued_job = Job.objects.get(key=key)
+
+        if queued_job.status in (Job.DONE, Job.FAILED):
+            # A finished job is queued again; one that is pending or running
+            # still does the work
+            rearmed = Job.objects.filter(
+                pk=queued_job.pk, status__in=(Job.DONE, Job.FAILED)
+            ).update(status=Job.PENDING, attempts=0, locked_at=None,
+                     last_error='', updated_at=timezone.now(), **fields)
+
+            if rearmed:
+                queued_job.refresh_from_db()
+
+    if settings.JOBS_EAGER and queued_job.status == Job.PENDING:
+        transaction.on_commit(lambda: run_now(queued_job.pk))
+
+    return queued_job
+
+
+def claim_job(job_id, status, locked_at, now):
+    # Only one worker wins the update, without needing row locks. A stale
+    # job is matched on the lock it was read with, so two workers that saw
+    # it stale cannot both take it over.
+    return Job.objects.filter(
+        pk=job_id, status=status, locked_at=locked_at
+    ).update(
+        status=Job.RUNNING,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    ) == 1
+
+
+def claim_jobs(limit):
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    candidates = Job.objects.filter(
+        Q(status=Job.PENDING, run_at__lte=now) |
+        Q(status=Job.RUNNING, locked_at__lt=stale)
+    ).order_by('run_at', 'id').values_list('id', 'status', 'locked_at')
+    claimed = []
+
+    for job_id, status, locked_at in candidates[:limit]:
+        if claim_job(job_id, status, locked_at, now):
+            claimed.append(job_id)
+
+    return claimed
+
+
+def run_now(job_id):
+    # Eager jobs still have to be claimed, a run_jobs worker may have
+    # taken the job since it was enqueued
+    if not claim_job(job_id, Job.PENDING, None, timezone.now()):
+        return None
+
+    return run_claimed(job_id)
+
+
+def run_claimed(job_id):
+    queued_job = Job.objects.get(pk=job_id)
+
+    try:
+        # A job queued by a newer release may not be registered here yet,
+        # it is retried and fails like any other error
+        func, _ = registry[queued_job.name]
+        func(**queued_job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s failed\n%s', queued_job, error)
+        queued_job.last_error = error
+        queued_job.locked_at = None
+
+        if queued_job.attempts < queued_job.max_attempts:
+            queued_job.status = Job.PENDING
+            queued_job.run_at = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (queued_job.attempts - 1)
+            )
+        else:
+            queued_job.status = Job.FAILED
+    else:
+        queued_job.status = Job.DONE
+        queued_job.locked_at = None
+
+    queued_job.save(update_fields=[
+        'status', 'run_at', 'locked_at', 'last_error', 'updated_at'
+    ])
+    return queued_job
+
+
+def run_in_thread(job_id):
+    try:
+        return run_claimed(job_id)
+    finally:
+        connection.close()
+
+
+def run_pending_jobs(limit=100, workers=1):
+    job_ids = claim_jobs(limit)
+
+    if workers <= 1:
+        return [run_claimed(job_id) for job_id in job_ids]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_in_thread, job_ids))
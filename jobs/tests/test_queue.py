@@ -0,0 +1,136 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import (
+    claim_job, claim_jobs, enqueue, job, run_now, run_pending_jobs,
+)
+
+calls = Mock()
+
+
+@job('jobs.tests.record', max_attempts=2)
+def record(**payload):
+    return calls(**payload)
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.reset_mock(side_effect=True)
+        return super().setUp()
+
+    def test_enqueue_unknown_job_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            enqueue('jobs.tests.unknown')
+
+    def test_enqueue_with_the_same_key_returns_the_existing_job(self):
+        first = enqueue('jobs.tests.record', {'value': 1}, key='same')
+        second = enqueue('jobs.tests.record', {'value': 2}, key='same')
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_enqueue_with_the_key_of_a_finished_job_queues_it_again(self):
+        first = enqueue('jobs.tests.record', {'value': 1}, key='same')
+        run_pending_jobs()
+        second = enqueue('jobs.tests.record', {'value': 2}, key='same')
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.status, Job.PENDING)
+        self.assertEqual(second.attempts, 0)
+        run_pending_jobs()
+        calls.assert_called_with(value=2)
+
+    def test_run_pending_jobs_runs_the_job_with_its_payload(self):
+        enqueue('jobs.tests.record', {'value': 1})
+        [finished] = run_pending_jobs()
+
+        calls.assert_called_once_with(value=1)
+        self.assertEqual(finished.status, Job.DONE)
+        self.assertEqual(finished.attempts, 1)
+
+    def test_failed_job_is_retried_later_then_marked_as_failed(self):
+        calls.side_effect = ValueError('boom')
+        queued = enqueue('jobs.tests.record')
+
+        [retry] = run_pending_jobs()
+        self.assertEqual(retry.status, Job.PENDING)
+        self.assertIn('boom', retry.last_error)
+        self.assertGreater(retry.run_at, timezone.now())
+
+        # Not due yet
+        self.assertEqual(run_pending_jobs(), [])
+
+        Job.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        [failed] = run_pending_jobs()
+        self.assertEqual(failed.status, Job.FAILED)
+        self.assertEqual(failed.attempts, 2)
+
+    def test_unknown_job_fails_instead_of_staying_running(self):
+        Job.objects.create(name='jobs.tests.gone', max_attempts=1)
+
+        [failed] = run_pending_jobs()
+
+        self.assertEqual(failed.status, Job.FAILED)
+        self.assertIsNone(failed.locked_at)
+        self.assertIn('jobs.tests.gone', failed.last_error)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        enqueue('jobs.tests.record')
+
+        self.assertEqual(len(claim_jobs(10)), 1)
+        self.assertEqual(claim_jobs(10), [])
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_stale_running_job_is_claimed_again(self):
+        queued = enqueue('jobs.tests.record')
+        claim_jobs(10)
+        Job.objects.filter(pk=queued.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=120)
+        )
+
+        self.assertEqual(claim_jobs(10), [queued.pk])
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_stale_job_is_reclaimed_by_one_worker_only(self):
+        queued = enqueue('jobs.tests.record')
+        claim_jobs(10)
+        stale_lock = timezone.now() - timedelta(seconds=120)
+        Job.objects.filter(pk=queued.pk).update(locked_at=stale_lock)
+
+        # Both workers read the job as stale, the second one loses
+        now = timezone.now()
+        self.assertTrue(claim_job(queued.pk, Job.RUNNING, stale_lock, now))
+        self.assertFalse(claim_job(queued.pk, Job.RUNNING, stale_lock, now))
+        queued.refresh_from_db()
+        self.assertEqual(queued.attempts, 2)
+
+    def test_eager_run_skips_a_job_claimed_by_a_worker(self):
+        queued = enqueue('jobs.tests.record', {'value': 1})
+        claim_jobs(10)
+
+        self.assertIsNone(run_now(queued.pk))
+        calls.assert_not_called()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.RUNNING)
+        self.assertEqual(queued.attempts, 1)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_jobs_run_when_the_transaction_commits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queued = enqueue('jobs.tests.record', {'value': 1})
+            calls.assert_not_called()
+
+        calls.assert_called_once_with(value=1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.DONE)
+
+    def test_run_jobs_command_runs_due_jobs_once(self):
+        enqueue('jobs.tests.record', {'value': 1})
+        call_command('run_jobs', '--once', '--workers=1', stdout=Mock())
+
+        calls.assert_called_once_with(value=1)
@@ -50,9 +50,11 @@ INSTALLED_APPS = [
     'recipes',
     'authors',
     'tag',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'utils.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -97,6 +99,22 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a cache shared by all workers (Redis, Memcached) in production, so
+# the invalidation done by one process is seen by the others.
+
+CACHES = {
+    'default': {
+        'BACKEND': get_env_variable(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': get_env_variable('CACHE_LOCATION'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -179,4 +197,45 @@ SIMPLE_JWT = {
 
 CORS_ALLOWED_ORIGINS = parse_comma_sep_str_to_list(
     get_env_variable('CORS_ALLOWED_ORIGINS')
-)
\ No newline at end of file
+)
+
+# Opt-in cache of the public recipe pages for anonymous users. Entries are
+# invalidated by recipes/signals.py when a recipe changes.
+RECIPES_PAGE_CACHE = True if os.environ.get('RECIPES_PAGE_CACHE') == '1' else False
+RECIPES_PAGE_CACHE_TIMEOUT = int(os.environ.get('RECIPES_PAGE_CACHE_TIMEOUT', 600))
+
+# Rendered recipe cards are cached per recipe id, updated_at and language
+RECIPES_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('RECIPES_FRAGMENT_CACHE_TIMEOUT', 300))
+
+# Published recipe counters used by the paginators, see recipes/counts.py
+RECIPES_COUNT_CACHE_TIMEOUT = int(os.environ.get('RECIPES_COUNT_CACHE_TIMEOUT', 3600))
+
+# Per-request SQL recording, see utils/query_budget.py. Results are sent as
+# X-Query-* response headers and logged when a budget is exceeded.
+QUERY_BUDGET_ENABLED = DEBUG or os.environ.get('QUERY_BUDGET_ENABLED') == '1'
+QUERY_BUDGET_REPEAT_THRESHOLD = int(os.environ.get('QUERY_BUDGET_REPEAT_THRESHOLD', 3))
+QUERY_BUDGETS = {
+    'recipes:home': 3,
+    'recipes:category': 3,
+    'recipes:tag': 3,
+    'recipes:search': 3,
+    'recipes:recipe': 3,
+    'recipes:api_v1': 3,
+    'recipes:api_v1_detail': 3,
+    'recipes:recipes-api-list': 4,
+    'recipes:recipes-api-detail': 3,
+}
+
+# Background jobs, see jobs/queue.py. Run them with `manage.py run_jobs`, or
+# set JOBS_EAGER=1 to run each job right after its transaction commits.
+JOBS_EAGER = True if os.environ.get('JOBS_EAGER') == '1' else False
+JOBS_LOCK_TIMEOUT = int(os.environ.get('JOBS_LOCK_TIMEOUT', 600))
+JOBS_RETRY_DELAY = int(os.environ.get('JOBS_RETRY_DELAY', 30))
+
+# Uploaded covers over these limits are not decoded, see utils/img_recize.py
+COVER_MAX_PIXELS = int(os.environ.get('COVER_MAX_PIXELS', 64_000_000))
+COVER_MAX_BYTES = int(os.environ.get('COVER_MAX_BYTES', 25 * 1024 * 1024))
+
+# Stores new covers once per content under recipes/covers/sha256/, see
+# recipes/storage.py. Recipes sharing a cover share its variants.
+RECIPES_COVER_DEDUP = True if os.environ.get('RECIPES_COVER_DEDUP') == '1' else False
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self, *args, **kwargs):
+        import recipes.signals  # noqa: F401
+        super_ready = super().ready(*args, **kwargs)
+        return super_ready
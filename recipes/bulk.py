@@ -0,0 +1,94 @@
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.db import transaction
+
+from recipes.counts import adjust_published_counts, get_count_scopes
+from recipes.models import Recipe
+from recipes.search import index_new_recipes
+from recipes.signals import invalidate_recipe_pages
+from recipes.suggest import record_suggestion_changes
+from tag.models import Tag
+
+DUPLICATE_TITLE_ERROR = 'Found recipes with the same title'
+
+
+def get_taken_titles(normalized_titles):
+    # One query for the whole batch, on the title_normalized index
+    return set(Recipe.objects.filter(
+        title_normalized__in=set(normalized_titles)
+    ).values_list('title_normalized', flat=True))
+
+
+def get_existing_tag_ids(tag_ids):
+    return set(Tag.objects.filter(
+        pk__in=set(tag_ids)
+    ).values_list('id', flat=True))
+
+
+def update_published_recipes(recipes, recipe_tag_ids):
+    # What the recipes signals do for each published recipe, once per batch
+    scopes = defaultdict(list)
+    scopes[len(recipes)].append('home')
+    category_counts = Counter(recipe.category_id for recipe in recipes)
+    tag_counts = Counter(
+        tag_id for tag_ids in recipe_tag_ids for tag_id in set(tag_ids)
+    )
+
+    for category_id, delta in category_counts.items():
+        scopes[delta].extend(get_count_scopes(
+            category_ids=[category_id], include_home=False
+        ))
+
+    for tag_id, delta in tag_counts.items():
+        scopes[delta].extend(get_count_scopes(
+            tag_ids=[tag_id], include_home=False
+        ))
+
+    for delta, delta_scopes in scopes.items():
+        transaction.on_commit(
+            partial(adjust_published_counts, delta_scopes, delta)
+        )
+
+    record_suggestion_changes(
+        ('recipe', recipe.pk, recipe.title, recipe.pk) for recipe in recipes
+    )
+
+    invalidate_recipe_pages(
+        recipe_ids=[recipe.pk for recipe in recipes],
+        category_ids=set(category_counts),
+        tag_slugs=list(Tag.objects.filter(
+            pk__in=tag_counts
+        ).values_list('slug', flat=True)),
+    )
+
+
+def bulk_create_recipes(recipes, recipe_tag_ids):
+    # recipe_tag_ids holds the tag ids of each recipe, in the same order.
+    # bulk_create() sends no signals, their work is done here for the batch.
+    for recipe in recipes:
+        recipe.set_generated_fields()
+
+    TagRelation = Recipe.tags.through
+
+    with transaction.atomic():
+        recipes = Recipe.objects.bulk_create(recipes)
+        TagRelation.objects.bulk_create(
+            TagRelation(recipe_id=recipe.pk, tag_id=tag_id)
+            for recipe, tag_ids in zip(recipes, recipe_tag_ids)
+            for tag_id in dict.fromkeys(tag_ids)
+        )
+        index_new_recipes(recipes)
+        published = [
+            (recipe, tag_ids)
+            for recipe, tag_ids in zip(recipes, recipe_tag_ids)
+            if recipe.is_published
+        ]
+
+        if published:
+            update_published_recipes(
+                [recipe for recipe, _ in published],
+                [tag_ids for _, tag_ids in published],
+            )
+
+    return recipes
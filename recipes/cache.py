@@ -0,0 +1,139 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+
+PAGE_CACHE_PREFIX = 'recipes:page'
+
+
+def _group_version_key(group):
+    return f'{PAGE_CACHE_PREFIX}:version:{group}'
+
+
+def get_group_version(group):
+    # A missing version (never set or evicted) gets a brand new value, so
+    # entries written under an older version can never come back to life.
+    version_key = _group_version_key(group)
+    version = cache.get(version_key)
+
+    if version is None:
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def bump_group_version(group):
+    version_key = _group_version_key(group)
+    try:
+        return cache.incr(version_key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(version_key, version, timeout=None)
+        return version
+
+
+def invalidate_cache_groups(groups):
+    for group in set(groups):
+        bump_group_version(group)
+
+
+def get_recipe_page_groups(category_ids=(), tag_slugs=(), recipe_ids=()):
+    return [
+        'home',
+        *(f'category:{category_id}' for category_id in category_ids
+          if category_id is not None),
+        *(f'tag:{slug}' for slug in tag_slugs),
+        *(f'recipe:{recipe_id}' for recipe_id in recipe_ids),
+    ]
+
+
+def is_cacheable_request(request):
+    if not getattr(settings, 'RECIPES_PAGE_CACHE', False):
+        return False
+
+    if request.method != 'GET':
+        return False
+
+    # Only anonymous traffic is cached. Without a session or a JWT there is
+    # no user, and pending flash messages must not end up in a shared page.
+    if 'HTTP_AUTHORIZATION' in request.META:
+        return False
+
+    return not any(
+        cookie in request.COOKIES
+        for cookie in (settings.SESSION_COOKIE_NAME, CookieStorage.cookie_name)
+    )
+
+
+def make_page_cache_key(group, request):
+    request_id = '|'.join((
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        translation.get_language() or '',
+    ))
+    digest = md5(request_id.encode(), usedforsecurity=False).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{group}:{get_group_version(group)}:{digest}'
+
+
+class CachedResponseMixin:
+    # Views return the group their page belongs to, the signals bump the
+    # version of every group a recipe appears in when it changes.
+    def get_cache_group(self):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        group = None
+
+        if is_cacheable_request(request):
+            group = self.get_cache_group()
+
+        if group is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        cache_key = make_page_cache_key(group, request)
+        cached = cache.get(cache_key)
+
+        if cached is not None:
+            response = HttpResponse(cached['content'], status=cached['status'])
+            for header, value in cached['headers'].items():
+                response.headers[header] = value
+            response.headers['X-Page-Cache'] = 'hit'
+            return get_conditional_response(
+                request,
+                etag=response.headers.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.headers.get('Last-Modified')
+                ),
+                response=response,
+            )
+
+        response = super().dispatch(request, *args, **kwargs)
+
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+
+        if (
+            response.status_code == 200 and
+            not response.streaming and
+            not response.cookies
+        ):
+            cache.set(
+                cache_key,
+                {
+                    'status': response.status_code,
+                    'content': response.content,
+                    'headers': dict(response.headers),
+                },
+                settings.RECIPES_PAGE_CACHE_TIMEOUT,
+            )
+            response.headers['X-Page-Cache'] = 'miss'
+
+        return response
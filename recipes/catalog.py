@@ -0,0 +1,48 @@
+import threading
+
+from recipes.cache import get_group_version, invalidate_cache_groups
+
+
+CATALOG_GROUP = 'catalog'
+
+
+class Catalog:
+    # In-process copy of the categories and tags. Every worker compares its
+    # version with the shared one in the cache and reloads when it moved.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.categories = {}
+        self.tags = {}
+
+    def load(self, version):
+        from recipes.models import Category
+        from tag.models import Tag
+
+        self.categories = dict(Category.objects.values_list('id', 'name'))
+        self.tags = {
+            slug: (pk, name)
+            for slug, pk, name in Tag.objects.values_list('slug', 'id', 'name')
+        }
+        self.version = version
+
+    def refresh(self):
+        version = get_group_version(CATALOG_GROUP)
+
+        if self.version != version:
+            with self._lock:
+                if self.version != version:
+                    self.load(version)
+
+        return self
+
+
+catalog = Catalog()
+
+
+def get_catalog():
+    return catalog.refresh()
+
+
+def invalidate_catalog():
+    invalidate_cache_groups([CATALOG_GROUP])
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import Recipe
+
+
+COUNT_PREFIX = 'recipes:count'
+
+
+def _count_key(scope):
+    return f'{COUNT_PREFIX}:{scope}'
+
+
+def get_count_scopes(category_ids=(), tag_ids=(), include_home=True):
+    return [
+        *(['home'] if include_home else []),
+        *(f'category:{category_id}' for category_id in category_ids
+          if category_id is not None),
+        *(f'tag:{tag_id}' for tag_id in tag_ids),
+    ]
+
+
+def count_published(scope):
+    qs = Recipe.objects.filter(is_published=True)
+    kind, _, value = scope.partition(':')
+
+    if kind == 'category':
+        qs = qs.filter(category_id=value)
+    elif kind == 'tag':
+        qs = qs.filter(tags__id=value)
+
+    return qs.count()
+
+
+def get_published_count(scope):
+    # Counted once, then kept up to date by the recipes signals. The timeout
+    # only bounds how long a drifted counter can live.
+    count_key = _count_key(scope)
+    count = cache.get(count_key)
+
+    if count is None:
+        count = count_published(scope)
+        cache.add(count_key, count, settings.RECIPES_COUNT_CACHE_TIMEOUT)
+
+    return count
+
+
+def adjust_published_counts(scopes, delta):
+    for scope in scopes:
+        try:
+            cache.incr(_count_key(scope), delta)
+        except ValueError:
+            # Not counted yet, it will be counted on first use
+            pass
+
+
+def get_capped_count(queryset, cap):
+    # Counts at most cap + 1 rows, callers show "cap+" when it is above
+    return queryset.order_by()[:cap + 1].count()
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.queue import job
+from recipes.cache import get_recipe_page_groups, invalidate_cache_groups
+from recipes.models import Recipe
+from utils.img_recize import InvalidImage, make_cover_variants
+
+
+@job('recipes.process_cover')
+def process_cover(cover, recipe_id=None):
+    # recipe_id is only set on jobs queued before covers could be shared,
+    # the variants go to every recipe that uses the cover
+    recipes = Recipe.objects.filter(cover=cover)
+    rows = list(recipes.values_list('id', 'category_id'))
+
+    # Deleted or given another cover since the job was queued
+    if not rows:
+        return
+
+    try:
+        variants = make_cover_variants(Recipe(cover=cover).cover)
+    except InvalidImage:
+        # Missing, unreadable or truncated files and images over the limits
+        # fail for good, retrying cannot fix them. Errors writing the
+        # variants are raised, so the job is retried.
+        status, variants = Recipe.COVER_FAILED, {}
+    else:
+        status = Recipe.COVER_READY
+
+    # update() skips the save signals; updated_at is bumped so the cached
+    # cards and pages pick up the new markup
+    updated = recipes.update(
+        cover_status=status,
+        cover_variants=variants,
+        updated_at=timezone.now(),
+    )
+
+    if not updated:
+        return
+
+    recipe_ids = [recipe_id for recipe_id, _ in rows]
+    groups = get_recipe_page_groups(
+        category_ids={category_id for _, category_id in rows},
+        tag_slugs=list(Recipe.tags.through.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('tag__slug', flat=True).distinct()),
+        recipe_ids=recipe_ids,
+    )
+    transaction.on_commit(lambda: invalidate_cache_groups(groups))
@@ -0,0 +1,63 @@
+from recipes.models import Recipe
+
+
+class IdentityMap:
+    # One instance per (model, pk) for the lifetime of a request
+    def __init__(self):
+        self._objects = {}
+
+    def get(self, model, pk):
+        return self._objects.get((model._meta.label, int(pk)))
+
+    def add(self, obj):
+        if obj is not None:
+            self._objects[(obj._meta.label, obj.pk)] = obj
+        return obj
+
+
+class RecipeLoader:
+    def __init__(self):
+        self.identity_map = IdentityMap()
+        self._missing = set()
+
+    def get_published_recipe(self, pk):
+        pk = int(pk)
+        recipe = self.identity_map.get(Recipe, pk)
+
+        if recipe is not None or pk in self._missing:
+            return recipe
+
+        recipe = Recipe.objects.filter(
+            pk=pk,
+            is_published=True,
+        ).select_related(
+            'category', 'author', 'author__profile'
+        ).prefetch_related('tags').first()
+
+        if recipe is None:
+            self._missing.add(pk)
+            return None
+
+        self.add_recipe(recipe)
+        return recipe
+
+    def add_recipe(self, recipe):
+        self.identity_map.add(recipe)
+        self.identity_map.add(recipe.category)
+
+        if recipe.author is not None:
+            self.identity_map.add(recipe.author)
+            self.identity_map.add(getattr(recipe.author, 'profile', None))
+
+        for tag in recipe.tags.all():
+            self.identity_map.add(tag)
+
+
+def get_recipe_loader(request):
+    loader = getattr(request, '_recipe_loader', None)
+
+    if loader is None:
+        loader = RecipeLoader()
+        request._recipe_loader = loader
+
+    return loader
@@ -0,0 +1,244 @@
+import json
+from base64 import b64encode
+from itertools import count
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from recipes.models import Category, Recipe
+from recipes.seed import NEEDLE_WORD, seed_recipes
+from recipes.serializers import RecipeReadSerializer, RecipeSerializer
+from recipes.views.api import RecipeAPIv2Pagination
+from recipes.views.site import PER_PAGE
+from tag.models import Tag
+from utils.benchmark import benchmark_database, compare_results, measure
+
+# Recipes rendered per run by the serializer benchmarks
+SERIALIZE_BATCH = 100
+# Recipes sent per POST by api_v2_bulk_create
+BULK_BATCH = 50
+
+
+class Command(BaseCommand):
+    help = 'Measures latency and query counts of the recipe pages and APIs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[1000, 10000, 100000]
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--only', nargs='+', default=None,
+            help='Endpoint names to run, all of them by default'
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Writes the results to this JSON file'
+        )
+        parser.add_argument(
+            '--baseline', default=None,
+            help='JSON file from a previous run to compare against'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=20,
+            help='Allowed slowdown over the baseline, in percent'
+        )
+        parser.add_argument('--metric', default='p50')
+
+    def get_endpoints(self):
+        client = Client()
+        api_client = APIClient()
+        author, _ = User.objects.get_or_create(username='benchmark')
+        api_client.force_authenticate(user=author)
+
+        published = Recipe.objects.filter(is_published=True)
+        total = published.count()
+        recipe_id = published.order_by('id').values_list(
+            'id', flat=True
+        )[total // 2]
+        category_id = Category.objects.filter(
+            name__startswith='Seed'
+        ).order_by('id').values_list('id', flat=True).first()
+        tag_id, tag_slug = Tag.objects.order_by('id').values_list(
+            'id', 'slug'
+        ).first()
+        # What a favourites page asks for, spread over the table
+        batch_ids = ','.join(map(str, published.order_by('id').values_list(
+            'id', flat=True
+        )[::max(total // 20, 1)][:20]))
+        deep_page = max(total // PER_PAGE, 1)
+        api_deep_page = max(total // RecipeAPIv2Pagination.page_size, 1)
+        deep_id = published.order_by('id').values_list(
+            'id', flat=True
+        )[min(RecipeAPIv2Pagination.page_size, total - 1)]
+        # A DRF cursor positioned on the last page
+        api_deep_cursor = b64encode(f'p={deep_id}'.encode()).decode()
+        created = count()
+
+        def create_recipe():
+            response = api_client.post(
+                reverse('recipes:recipes-api-list'),
+                data={
+                    'title': f'Benchmark recipe {next(created)} {total}',
+                    'description': 'Created by the benchmark',
+                    'preparation_time': 10,
+                    'preparation_time_unit': 'Minutos',
+                    'servings': 2,
+                    'servings_unit': 'Porções',
+                    'preparation_steps': 'Benchmark steps',
+                },
+            )
+            assert response.status_code == 201, response.content
+
+        def create_recipes():
+            batch = next(created)
+            response = api_client.post(
+                reverse('recipes:recipes-api-bulk'),
+                data=[
+                    {
+                        'title': f'Benchmark bulk {batch} {i} {total}',
+                        'description': 'Created by the benchmark',
+                        'preparation_time': 10,
+                        'preparation_time_unit': 'Minutos',
+                        'servings': 2,
+                        'servings_unit': 'Porções',
+                        'preparation_steps': 'Benchmark steps',
+                        'tags': [tag_id],
+                    }
+                    for i in range(BULK_BATCH)
+                ],
+                format='json',
+            )
+            assert response.status_code == 201, response.content
+
+        # Recipes per call, reported as recipes per second
+        create_recipe.items = 1
+        create_recipes.items = BULK_BATCH
+
+        request = RequestFactory().get('/')
+
+        def serialize():
+            RecipeSerializer(
+                Recipe.objects.get_published()[:SERIALIZE_BATCH],
+                many=True,
+                context={'request': request},
+            ).data
+
+        def serialize_fast():
+            RecipeReadSerializer(
+                RecipeReadSerializer.project(
+                    Recipe.objects.get_published()
+                )[:SERIALIZE_BATCH],
+                request,
+            ).data
+
+        def get(client, url_name, *args, **params):
+            url = reverse(url_name, args=args)
+
+            def request():
+                response = client.get(url, data=params)
+                assert response.status_code == 200, (url, response.status_code)
+
+            return request
+
+        return {
+            'home': get(client, 'recipes:home'),
+            'home_deep': get(client, 'recipes:home', page=deep_page),
+            'category': get(client, 'recipes:category', category_id),
+            'tag': get(client, 'recipes:tag', tag_slug),
+            'search': get(client, 'recipes:search', q=NEEDLE_WORD),
+            'detail': get(client, 'recipes:recipe', recipe_id),
+            'api_v1': get(client, 'recipes:api_v1'),
+            'api_v1_detail': get(client, 'recipes:api_v1_detail', recipe_id),
+            'api_v2_list': get(api_client, 'recipes:recipes-api-list'),
+            'api_v2_list_deep': get(
+                api_client, 'recipes:recipes-api-list', page=api_deep_page
+            ),
+            'api_v2_cursor_deep': get(
+                api_client, 'recipes:recipes-api-list', cursor=api_deep_cursor
+            ),
+            'api_v2_batch': get(
+                api_client, 'recipes:recipes-api-batch',
+                ids=batch_ids, expand='author,category,tags',
+            ),
+            'api_v2_list_cards': get(
+                api_client, 'recipes:recipes-api-list',
+                fields='id,title,description,cover',
+            ),
+            'api_v2_retrieve': get(
+                api_client, 'recipes:recipes-api-detail', recipe_id
+            ),
+            'api_v2_create': create_recipe,
+            'api_v2_bulk_create': create_recipes,
+            'serialize_v2': serialize,
+            'serialize_v2_fast': serialize_fast,
+        }
+
+    def handle(self, *args, **options):
+        baseline = None
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        results = {}
+
+        with benchmark_database():
+            seeded = 0
+
+            for size in sorted(options['sizes']):
+                seed_recipes(size - seeded)
+                # Bulk inserts skip the signals that keep counts and pages
+                # up to date
+                cache.clear()
+                results[str(size)] = {}
+
+                for name, func in self.get_endpoints().items():
+                    if options['only'] and name not in options['only']:
+                        continue
+
+                    result = measure(
+                        func, options['repeat'], options['warmup']
+                    )
+                    throughput = ''
+
+                    if hasattr(func, 'items') and result['p50']:
+                        result['per_second'] = round(
+                            func.items * 1000 / result['p50'], 1
+                        )
+                        throughput = f' recipes/s={result["per_second"]}'
+
+                    results[str(size)][name] = result
+                    self.stdout.write(
+                        f'{size:>7} {name:<18} '
+                        f'p50={result["p50"]:>8.2f}ms '
+                        f'p95={result["p95"]:>8.2f}ms '
+                        f'p99={result["p99"]:>8.2f}ms '
+                        f'queries={result["queries"]}{throughput}'
+                    )
+
+                # Recipes created by api_v2_create count towards the size
+                seeded = Recipe.objects.count()
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+
+        if baseline is None:
+            return
+
+        regressions = compare_results(
+            results, baseline, options['threshold'], options['metric']
+        )
+
+        if regressions:
+            raise CommandError(
+                'Slower than the baseline:\n' + '\n'.join(regressions)
+            )
+
+        self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,126 @@
+import multiprocessing
+import resource
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from utils.benchmark import summarize
+
+# (name, width, height, format) of the generated corpus
+CORPUS = (
+    ('phone-12mp.jpg', 4032, 3024, 'JPEG'),
+    ('phone-40mp.jpg', 7296, 5472, 'JPEG'),
+    ('camera-24mp.png', 6000, 4000, 'PNG'),
+)
+
+
+def make_corpus(directory):
+    for name, width, height, image_format in CORPUS:
+        image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+        draw = ImageDraw.Draw(image)
+
+        # Some detail, so the encoders have real work to do
+        for x in range(0, width, 97):
+            draw.line((x, 0, width - x, height), fill=(x % 255, 90, 160), width=9)
+
+        image.save(Path(directory) / name, image_format, quality=92)
+        image.close()
+
+
+def get_peak_rss():
+    # VmHWM starts over at exec, ru_maxrss keeps the parent's peak on Linux
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        ...
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def process_image(media_root, name, fast_decode, results):
+    # Runs in a fresh process so ru_maxrss is the peak of this image only,
+    # on top of the Django startup reported as the baseline
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from utils.img_recize import make_cover_variants
+
+    settings.MEDIA_ROOT = Path(media_root)
+    start_rss = get_peak_rss()
+    start = perf_counter()
+    make_cover_variants(SimpleNamespace(name=name), fast_decode=fast_decode)
+    elapsed = (perf_counter() - start) * 1000
+    results.put((elapsed, get_peak_rss(), start_rss))
+
+
+class Command(BaseCommand):
+    help = 'Measures time and peak memory of the cover variants per image'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corpus', default=None,
+            help='Directory of sample images, a generated one by default'
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def measure(self, media_root, name, fast_decode, repeat):
+        context = multiprocessing.get_context('spawn')
+        timings, peaks, baselines = [], [], []
+
+        for _ in range(repeat):
+            results = context.Queue()
+            process = context.Process(
+                target=process_image,
+                args=(media_root, name, fast_decode, results),
+            )
+            process.start()
+            elapsed, peak, baseline = results.get()
+            process.join()
+            timings.append(elapsed)
+            peaks.append(peak)
+            baselines.append(baseline)
+
+        return summarize(timings), max(peaks), max(baselines)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as media_root:
+            corpus = options['corpus']
+
+            if corpus is None:
+                corpus = media_root
+                make_corpus(corpus)
+
+            for path in sorted(Path(corpus).iterdir()):
+                if path.suffix.lower() not in ('.jpg', '.jpeg', '.png', '.webp'):
+                    continue
+
+                # Variants are written to the temporary directory
+                name = path.name
+                target = Path(media_root) / name
+
+                if not target.exists():
+                    target.symlink_to(path.resolve())
+
+                with Image.open(path) as image:
+                    megapixels = image.width * image.height / 1_000_000
+
+                for fast_decode in (False, True):
+                    timing, peak, baseline = self.measure(
+                        media_root, name, fast_decode, options['repeat']
+                    )
+                    mode = 'fast' if fast_decode else 'full'
+                    self.stdout.write(
+                        f'{name:<20} {megapixels:>5.1f}MP {mode:<5} '
+                        f'p50={timing["p50"]:>8.1f}ms '
+                        f'max={timing["max"]:>8.1f}ms '
+                        f'peak_rss={peak:>6.1f}MB '
+                        f'(startup {baseline:.1f}MB)'
+                    )
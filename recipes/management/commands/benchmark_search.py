@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.test import Client
+from django.urls import reverse
+
+from recipes.models import Recipe
+from recipes.search import search_recipes
+from recipes.seed import NEEDLE_WORD, seed_recipes
+from utils.benchmark import benchmark_database, measure
+
+
+SEARCH_TERMS = (NEEDLE_WORD, NEEDLE_WORD[:4], 'bolo cenoura')
+FIRST_PAGE = 6
+
+
+class Command(BaseCommand):
+    help = 'Measures search latency (FTS vs LIKE) as the recipe table grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[1000, 10000, 100000]
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def like_search(self, term):
+        qs = Recipe.objects.filter(is_published=True).filter(
+            Q(title__icontains=term) | Q(description__icontains=term)
+        ).order_by('-id')
+        return list(qs[:FIRST_PAGE])
+
+    def fts_search(self, term):
+        qs = Recipe.objects.filter(is_published=True)
+        return list(search_recipes(qs, term)[:FIRST_PAGE])
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        search_url = reverse('recipes:search')
+
+        with benchmark_database():
+            client = Client()
+            seeded = 0
+
+            for size in sorted(options['sizes']):
+                seed_recipes(size - seeded)
+                seeded = size
+
+                for term in SEARCH_TERMS:
+                    results = {
+                        'like': measure(
+                            lambda: self.like_search(term), repeat
+                        ),
+                        'fts': measure(
+                            lambda: self.fts_search(term), repeat
+                        ),
+                        'view': measure(
+                            lambda: client.get(search_url, {'q': term}),
+                            repeat
+                        ),
+                    }
+
+                    for name, result in results.items():
+                        self.stdout.write(
+                            f'{size:>7} {term!r:<16} {name:<5} '
+                            f'p50={result["p50"]:>8.2f}ms '
+                            f'p95={result["p95"]:>8.2f}ms '
+                            f'queries={result["queries"]}'
+                        )
@@ -0,0 +1,85 @@
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from recipes.storage import UPLOAD_GRACE_SECONDS
+from utils.img_recize import get_variant_names
+
+COVERS_DIR = 'recipes/covers'
+
+
+def iter_files(directory):
+    # os.scandir keeps one directory listing in memory at a time
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def get_referenced_names():
+    # One streamed query over the covers and their variants
+    referenced = set()
+    rows = Recipe.objects.exclude(cover='').values_list(
+        'cover', 'cover_variants'
+    ).iterator(chunk_size=2000)
+
+    for cover, variants in rows:
+        referenced.add(cover)
+        referenced.update(get_variant_names(variants or {}))
+
+    return referenced
+
+
+class Command(BaseCommand):
+    help = 'Removes cover files that no recipe references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Lists the orphaned files without removing them'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=UPLOAD_GRACE_SECONDS,
+            help='Seconds a file must be untouched, so uploads of '
+                 'transactions still in flight are kept'
+        )
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT)
+        referenced = get_referenced_names()
+        newest = time.time() - options['min_age']
+        removed = removed_bytes = 0
+
+        for entry in iter_files(media_root / COVERS_DIR):
+            name = Path(entry.path).relative_to(media_root).as_posix()
+            stat = entry.stat(follow_symlinks=False)
+
+            if name in referenced or stat.st_mtime > newest:
+                continue
+
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+
+            removed += 1
+            removed_bytes += stat.st_size
+
+        action = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(
+            f'{action} {removed} file(s), {removed_bytes / 1024 / 1024:.1f}MB'
+        )
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_fts USING fts5('
+        'title, description, preparation_steps, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        'INSERT INTO recipes_recipe_fts '
+        '(rowid, title, description, preparation_steps) '
+        'SELECT id, title, description, preparation_steps FROM recipes_recipe'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute('DROP TABLE IF EXISTS recipes_recipe_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_alter_recipe_options_recipe_tags_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_search_index'),
+        ('tag', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-id'], name='recipes_published_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-id'], name='recipes_category_pub_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['author', '-id'], name='recipes_author_pub_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_published', False)), fields=['author', '-id'], name='recipes_author_draft_id_idx'),
+        ),
+        # The auto-created m2m table only has (recipe_id, tag_id), tag pages
+        # look it up the other way around
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX recipes_recipe_tags_tag_recipe_idx '
+                'ON recipes_recipe_tags (tag_id, recipe_id)'
+            ),
+            reverse_sql='DROP INDEX recipes_recipe_tags_tag_recipe_idx',
+        ),
+    ]
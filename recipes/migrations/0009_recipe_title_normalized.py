@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+from utils.strings import fold_text
+
+
+def backfill_title_normalized(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recipes = []
+
+    for recipe in Recipe.objects.only('id', 'title').iterator(chunk_size=1000):
+        recipe.title_normalized = fold_text(recipe.title)
+        recipes.append(recipe)
+
+        if len(recipes) == 1000:
+            Recipe.objects.bulk_update(recipes, ['title_normalized'])
+            recipes = []
+
+    Recipe.objects.bulk_update(recipes, ['title_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_published_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='title_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(
+            backfill_title_normalized,
+            migrations.RunPython.noop,
+        ),
+    ]
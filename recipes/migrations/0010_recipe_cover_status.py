@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+def mark_existing_covers_ready(apps, schema_editor):
+    # Covers saved before the job queue were resized in Recipe.save
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.exclude(cover='').update(cover_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_title_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='cover_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='', editable=False, max_length=10),
+        ),
+        migrations.RunPython(
+            mark_existing_covers_ready,
+            migrations.RunPython.noop,
+        ),
+    ]
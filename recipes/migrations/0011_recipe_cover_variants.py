@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_cover_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
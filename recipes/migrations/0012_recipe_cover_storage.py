@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 11:16
+
+import recipes.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_cover_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='cover',
+            field=models.ImageField(blank=True, db_index=True, default='', storage=recipes.storage.CoverStorage(), upload_to=recipes.storage.cover_upload_to),
+        ),
+    ]
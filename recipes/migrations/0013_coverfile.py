@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:33
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_covers(apps, schema_editor):
+    # Content-addressed covers saved before their references were counted
+    Recipe = apps.get_model('recipes', 'Recipe')
+    CoverFile = apps.get_model('recipes', 'CoverFile')
+    covers = Recipe.objects.filter(
+        cover__startswith='recipes/covers/sha256/'
+    ).values('cover').annotate(refs=Count('id'))
+    CoverFile.objects.bulk_create(
+        CoverFile(name=cover['cover'], refs=cover['refs']) for cover in covers
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_recipe_cover_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('refs', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(
+            count_existing_covers,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -2,10 +2,13 @@ import os
 import string
 
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models import F, Value
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Prefetch, Q, Value
 from django.db.models.functions import Concat
-from utils.img_recize import img_recize
+from jobs.queue import enqueue
+from recipes.storage import cover_storage, cover_upload_to, is_content_addressed
+from utils.dirty_fields import DirtyFieldsMixin
+from utils.strings import fold_text
 from django.utils.text import slugify
 from django.urls import reverse
 from django.utils.translation import gettext as _
@@ -28,21 +31,73 @@ class Category(models.Model):
     
 
 class RecipeManager(models.Manager):
-    def get_published(self):
-        return self.filter(
+    def get_published(self, author_full_name=True, tags=True):
+        queryset = self.filter(
             is_published=True
-        ).annotate(
-            author_full_name=Concat(
-                F('author__first_name'), Value(' '),
-                F('author__last_name'), Value(' ('),
-                F('author__username'), Value(')'),
+        ).order_by('-id').select_related('category', 'author')
+
+        if author_full_name:
+            queryset = queryset.annotate(
+                author_full_name=Concat(
+                    F('author__first_name'), Value(' '),
+                    F('author__last_name'), Value(' ('),
+                    F('author__username'), Value(')'),
+                )
             )
-        ).order_by('-id').select_related('category', 'author').prefetch_related('tags')
+
+        if tags:
+            queryset = queryset.prefetch_related(
+                # Ordered, so every serializer lists the tags the same way
+                Prefetch('tags', queryset=Tag.objects.order_by('id'))
+            )
+
+        return queryset
+
+
+class CoverFileManager(models.Manager):
+    def acquire(self, name):
+        # The updated row stays locked until the calling transaction commits
+        with transaction.atomic():
+            if self.filter(name=name).update(refs=F('refs') + 1):
+                return
+
+            try:
+                with transaction.atomic():
+                    self.create(name=name, refs=1)
+            except IntegrityError:
+                self.filter(name=name).update(refs=F('refs') + 1)
+
+    def release(self, name):
+        self.filter(name=name, refs__gt=0).update(refs=F('refs') - 1)
 
 
-class Recipe(models.Model):
+class CoverFile(models.Model):
+    # Number of recipes using a content-addressed cover, see recipes/storage.py
+    name = models.CharField(max_length=100, unique=True)
+    refs = models.PositiveIntegerField(default=0)
+
+    objects = CoverFileManager()
+
+    def __str__(self):
+        return self.name
+
+
+class Recipe(DirtyFieldsMixin, models.Model):
+    COVER_PENDING = 'pending'
+    COVER_READY = 'ready'
+    COVER_FAILED = 'failed'
+    COVER_STATUS_CHOICES = (
+        (COVER_PENDING, _('Pending')),
+        (COVER_READY, _('Ready')),
+        (COVER_FAILED, _('Failed')),
+    )
+
     objects = RecipeManager()
     title = models.CharField(max_length=65, verbose_name=_('Title'))
+    # fold_text(title), kept by save() for the duplicate title check
+    title_normalized = models.CharField(
+        max_length=255, default='', editable=False, db_index=True
+    )
     description = models.CharField(max_length=165, verbose_name=_('Description'))
     slug = models.SlugField(unique=True, blank=True)
     preparation_time = models.IntegerField(verbose_name=_('Preparation Time'))
@@ -54,7 +109,20 @@ class Recipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_published = models.BooleanField(default=False)
-    cover = models.ImageField(upload_to='recipes/covers/%Y/%m/%d/', blank=True, default='')
+    cover = models.ImageField(
+        upload_to=cover_upload_to,
+        storage=cover_storage,
+        blank=True,
+        default='',
+        db_index=True,
+    )
+    # Covers are resized by the recipes.process_cover job, see recipes/jobs.py
+    cover_status = models.CharField(
+        max_length=10, choices=COVER_STATUS_CHOICES, blank=True, default='',
+        editable=False,
+    )
+    # Responsive variants of the cover, see utils.img_recize.make_cover_variants
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, blank=True, null=True)
     author = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
     tags = models.ManyToManyField(Tag, blank=True, default='')
@@ -65,7 +133,24 @@ class Recipe(models.Model):
     def get_absolute_url(self):
         return reverse('recipes:recipe', args=(self.id,))
 
-    def save(self, *args, **kwargs):
+    @property
+    def cover_srcset(self):
+        return ', '.join(
+            f'{self.cover.storage.url(variant["name"])} {variant["width"]}w'
+            for variant in self.cover_variants.get('webp', [])
+        )
+
+    @property
+    def cover_fallback(self):
+        fallback = self.cover_variants.get('fallback')
+
+        if not fallback:
+            return None
+
+        return {**fallback, 'url': self.cover.storage.url(fallback['name'])}
+
+    def set_generated_fields(self):
+        # Called by save() and before bulk_create(), which skips save()
         # Automatically generate slug if it doesn't exist
         if not self.slug:
             rand_letters = ''.join(
@@ -76,13 +161,61 @@ class Recipe(models.Model):
             )
             self.slug = slugify(f'{self.title}-{rand_letters}')
 
+        self.title_normalized = fold_text(self.title)
+
+    # One transaction with the cover references it counts
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        self.set_generated_fields()
+        update_fields = kwargs.get('update_fields')
+
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'title_normalized'}
+
+        uploaded = bool(self.cover) and not self.cover._committed
+
+        if uploaded:
+            # Stored ahead of the row, so a content-addressed name is known.
+            # The storage counts the reference to it.
+            self.cover.save(self.cover.name, self.cover.file, save=False)
+
+        cover_changed = bool(self.cover) and 'cover' in self.changed_fields
+
+        if (
+            cover_changed and not uploaded
+            and is_content_addressed(self.cover.name)
+        ):
+            # An existing file assigned by name
+            CoverFile.objects.acquire(self.cover.name)
+
+        if cover_changed or not self.cover:
+            self.cover_status = self.COVER_PENDING if cover_changed else ''
+            self.cover_variants = {}
+
+        if cover_changed and is_content_addressed(self.cover.name):
+            # The same content was already processed for another recipe
+            shared_variants = Recipe.objects.filter(
+                cover=self.cover.name, cover_status=self.COVER_READY
+            ).exclude(pk=self.pk).values_list('cover_variants', flat=True).first()
+
+            if shared_variants:
+                self.cover_status = self.COVER_READY
+                self.cover_variants = shared_variants
+
+        if update_fields is not None and 'cover' in update_fields:
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], 'cover_status', 'cover_variants'
+            }
+
         saved = super().save(*args, **kwargs)
 
-        if self.cover:
-            try:
-                img_recize(self.cover)
-            except FileNotFoundError:
-                pass
+        if cover_changed and self.cover_status == self.COVER_PENDING:
+            # Keyed by file, the job processes every recipe that uses it
+            enqueue(
+                'recipes.process_cover',
+                {'cover': self.cover.name},
+                key=f'recipes.process_cover:{self.cover.name}',
+            )
 
         return saved
     
@@ -90,18 +223,43 @@ class Recipe(models.Model):
         error_messages = defaultdict(list)
 
         recipe_from_db = Recipe.objects.filter(
-            title__iexact=self.title
-        ).first()
+            title_normalized=fold_text(self.title)
+        ).exclude(pk=self.pk).exists()
 
         if recipe_from_db:
-            if recipe_from_db.pk != self.pk:
-                error_messages['title'].append(
-                    'Found recipes with the same title'
-                )
+            error_messages['title'].append(
+                'Found recipes with the same title'
+            )
 
         if error_messages:
             raise ValidationError(error_messages)
 
     class Meta:
         verbose_name = _('Recipe')
-        verbose_name_plural = _('Recipes')
\ No newline at end of file
+        verbose_name_plural = _('Recipes')
+        # Public lists filter on is_published and order by -id, optionally
+        # by category, tag or author. The dashboard lists an author's drafts.
+        # Django compares booleans as a bare column, which SQLite can only
+        # match against a partial index with the same condition.
+        indexes = [
+            models.Index(
+                fields=['-id'],
+                condition=Q(is_published=True),
+                name='recipes_published_id_idx',
+            ),
+            models.Index(
+                fields=['category', '-id'],
+                condition=Q(is_published=True),
+                name='recipes_category_pub_id_idx',
+            ),
+            models.Index(
+                fields=['author', '-id'],
+                condition=Q(is_published=True),
+                name='recipes_author_pub_id_idx',
+            ),
+            models.Index(
+                fields=['author', '-id'],
+                condition=Q(is_published=False),
+                name='recipes_author_draft_id_idx',
+            ),
+        ]
\ No newline at end of file
@@ -0,0 +1,105 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+
+FTS_TABLE = 'recipes_recipe_fts'
+FTS_COLUMNS = ('title', 'description', 'preparation_steps')
+# bm25 weights, one per column in FTS_COLUMNS
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def is_fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(search_term):
+    # Every word must match and may be the beginning of a longer word
+    terms = re.findall(r'\w+', search_term)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_recipes(queryset, search_term):
+    if not is_fts_available():
+        return queryset.filter(
+            Q(
+                Q(title__icontains=search_term) |
+                Q(description__icontains=search_term)
+            ),
+        )
+
+    match_query = build_match_query(search_term)
+
+    if not match_query:
+        return queryset.none()
+
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = recipes_recipe.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match_query],
+        select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+    ).order_by('search_rank', '-id')
+
+
+def index_recipe(recipe):
+    if not is_fts_available():
+        return
+
+    columns = ', '.join(FTS_COLUMNS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [recipe.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, {columns}) '
+            'VALUES (%s, %s, %s, %s)',
+            [recipe.pk, *(getattr(recipe, column) for column in FTS_COLUMNS)]
+        )
+
+
+def index_new_recipes(recipes):
+    # For recipes inserted with bulk_create(), which are not indexed yet
+    if not is_fts_available() or not recipes:
+        return
+
+    columns = ', '.join(FTS_COLUMNS)
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, {columns}) '
+            'VALUES (%s, %s, %s, %s)',
+            [
+                [recipe.pk, *(getattr(recipe, column) for column in FTS_COLUMNS)]
+                for recipe in recipes
+            ]
+        )
+
+
+def unindex_recipe(recipe_id):
+    if not is_fts_available():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [recipe_id]
+        )
+
+
+def rebuild_search_index():
+    if not is_fts_available():
+        return
+
+    columns = ', '.join(FTS_COLUMNS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, {columns}) '
+            f'SELECT id, {columns} FROM recipes_recipe'
+        )
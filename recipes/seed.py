@@ -0,0 +1,118 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from authors.models import Profile
+from recipes.models import Category, Recipe
+from recipes.search import rebuild_search_index
+from tag.models import Tag
+from utils.strings import fold_text
+
+
+WORDS = (
+    'abacaxi', 'abobora', 'acucar', 'alho', 'ameixa', 'amendoim', 'arroz',
+    'assado', 'atum', 'azeite', 'bacalhau', 'banana', 'batata', 'baunilha',
+    'berinjela', 'bolo', 'brigadeiro', 'brocolis', 'cacau', 'cafe', 'caldo',
+    'camarao', 'canela', 'caramelo', 'carne', 'castanha', 'cebola',
+    'cenoura', 'cerveja', 'chocolate', 'coco', 'couve', 'creme', 'crocante',
+    'cuscuz', 'doce', 'empada', 'ervilha', 'escondidinho', 'espinafre',
+    'farofa', 'feijao', 'file', 'forno', 'frango', 'frito', 'gengibre',
+    'goiabada', 'grelhado', 'iogurte', 'laranja', 'legumes', 'leite',
+    'limao', 'linguica', 'lombo', 'macarrao', 'mandioca', 'manteiga',
+    'maracuja', 'massa', 'mel', 'milho', 'morango', 'moqueca', 'mousse',
+    'nozes', 'omelete', 'ovos', 'palmito', 'pamonha', 'pao', 'pastel',
+    'peixe', 'pimenta', 'pipoca', 'pudim', 'queijo', 'quiche', 'recheado',
+    'repolho', 'risoto', 'salada', 'salmao', 'sopa', 'suco', 'tapioca',
+    'tomate', 'torta', 'tropeiro', 'uva', 'vagem', 'vinagrete',
+)
+NEEDLE_WORD = 'quindim'
+NEEDLE_QTY = 10
+
+
+def _sentence(rng, qty):
+    return ' '.join(rng.choices(WORDS, k=qty))
+
+
+def seed_catalog(rng, categories=20, tags=100, authors=50):
+    if not Category.objects.filter(name__startswith='Seed').exists():
+        Category.objects.bulk_create(
+            Category(name=f'Seed {_sentence(rng, 1)} {i}')
+            for i in range(categories)
+        )
+        Tag.objects.bulk_create(
+            Tag(name=f'{_sentence(rng, 1)} {i}', slug=f'seed-tag-{i}')
+            for i in range(tags)
+        )
+        users = User.objects.bulk_create(
+            User(
+                username=f'seed-user-{i}',
+                first_name=_sentence(rng, 1).capitalize(),
+                last_name=_sentence(rng, 1).capitalize(),
+                password=make_password(None),
+            )
+            for i in range(authors)
+        )
+        Profile.objects.bulk_create(Profile(author=user) for user in users)
+
+    return (
+        list(Category.objects.filter(
+            name__startswith='Seed'
+        ).values_list('id', flat=True)),
+        list(Tag.objects.filter(
+            slug__startswith='seed-tag-'
+        ).values_list('id', flat=True)),
+        list(User.objects.filter(
+            username__startswith='seed-user-'
+        ).values_list('id', flat=True)),
+    )
+
+
+def seed_recipes(qty, batch_size=1000, tags_per_recipe=3, seed=42):
+    # Bulk inserts `qty` recipes (~10% drafts) and can be called again to
+    # grow the table. Exactly NEEDLE_QTY recipes carry NEEDLE_WORD, whatever
+    # the table size, so searching for it has a constant number of matches.
+    rng = random.Random(seed + Recipe.objects.count())
+    offset = Recipe.objects.count()
+    needles = NEEDLE_QTY - Recipe.objects.filter(
+        title__startswith=NEEDLE_WORD.capitalize()
+    ).count()
+
+    with transaction.atomic():
+        category_ids, tag_ids, author_ids = seed_catalog(rng)
+        TagRelation = Recipe.tags.through
+
+        for start in range(0, qty, batch_size):
+            recipes = []
+
+            for i in range(start, min(start + batch_size, qty)):
+                title = _sentence(rng, 3).capitalize()
+
+                if needles > 0:
+                    title = f'{NEEDLE_WORD.capitalize()} de {title}'
+                    needles -= 1
+
+                recipes.append(Recipe(
+                    title=title[:65],
+                    title_normalized=fold_text(title[:65]),
+                    description=_sentence(rng, 10)[:165],
+                    slug=f'seed-recipe-{offset + i}',
+                    preparation_time=rng.randint(5, 180),
+                    preparation_time_unit='Minutos',
+                    servings=rng.randint(1, 12),
+                    servings_unit='Porções',
+                    preparation_steps=_sentence(rng, 40),
+                    is_published=rng.random() < 0.9,
+                    category_id=rng.choice(category_ids),
+                    author_id=rng.choice(author_ids),
+                ))
+
+            recipes = Recipe.objects.bulk_create(recipes)
+            TagRelation.objects.bulk_create(
+                TagRelation(recipe_id=recipe.id, tag_id=tag_id)
+                for recipe in recipes
+                for tag_id in rng.sample(tag_ids, tags_per_recipe)
+            )
+
+        rebuild_search_index()
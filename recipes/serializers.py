@@ -1,5 +1,8 @@
+from collections import defaultdict
+
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.urls import reverse
 from tag.models import Tag
 from recipes.models import Recipe
 from authors.validators import AuthorRecipeValidator
@@ -50,4 +53,153 @@ class RecipeSerializer(serializers.ModelSerializer):
         return super_validate
     
     def save(self, **kwargs):
-        return super().save(**kwargs)
\ No newline at end of file
+        return super().save(**kwargs)
+
+
+class RecipeBulkItemSerializer(RecipeSerializer):
+    # One recipe of a bulk create. Tag ids and duplicate titles are checked
+    # for the whole batch by the view, not one query per item.
+    tags = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    cover = serializers.ImageField(read_only=True)
+
+
+class RecipeReadSerializer:
+    # Renders the same output as RecipeSerializer for reads, from values()
+    # rows and one query for the tags of every row, without the DRF field
+    # machinery. Used by the v2 list, retrieve and batch.
+    # With fields, only those are rendered and only their columns loaded.
+    # Fields in expand embed the related object instead of its id or name.
+    fields = RecipeSerializer.Meta.fields
+    tag_fields = frozenset(('tags', 'tag_objects', 'tag_links'))
+    expandable = ('author', 'category', 'tags')
+    columns = {
+        'category': ('category__name',),
+        'public': ('is_published',),
+        'preparation': ('preparation_time', 'preparation_time_unit'),
+        'tags': (),
+        'tag_objects': (),
+        'tag_links': (),
+    }
+    expanded_columns = {
+        # Same as AuthorSerializer, without the email
+        'author': (
+            'author', 'author__username', 'author__first_name',
+            'author__last_name',
+        ),
+        'category': ('category', 'category__name'),
+        'tags': (),
+    }
+
+    def __init__(self, rows, request, fields=None, expand=()):
+        self.rows = rows
+        self.request = request
+        self.fields = self.fields if fields is None else tuple(fields)
+        self.expand = frozenset(expand)
+
+    @classmethod
+    def project(cls, queryset, fields=None, expand=()):
+        # id is always loaded, the tags are grouped by it
+        columns = {'id': None}
+
+        for field in cls.fields if fields is None else fields:
+            if field in expand:
+                field_columns = cls.expanded_columns[field]
+            else:
+                field_columns = cls.columns.get(field, (field,))
+
+            columns.update(dict.fromkeys(field_columns))
+
+        return queryset.prefetch_related(None).values(*columns)
+
+    def get_tags(self, recipe_ids):
+        tags = defaultdict(list)
+        rows = Recipe.tags.through.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by('recipe_id', 'tag_id').values_list(
+            'recipe_id', 'tag_id', 'tag__name', 'tag__slug'
+        )
+
+        for recipe_id, tag_id, name, slug in rows:
+            tags[recipe_id].append((tag_id, name, slug))
+
+        return tags
+
+    def get_tag_link_parts(self):
+        # Reversed once, each link only joins the pk in between
+        link = self.request.build_absolute_uri(
+            reverse('recipes:recipes_api_v2_tag', kwargs={'pk': 0})
+        )
+        return link.rsplit('0', 1)
+
+    def get_renderers(self):
+        link_start, link_end = self.get_tag_link_parts()
+        cover_storage = Recipe._meta.get_field('cover').storage
+        build_absolute_uri = self.request.build_absolute_uri
+
+        def column(field):
+            return lambda row, tags: row[field]
+
+        def get_cover(row, tags):
+            if not row['cover']:
+                return None
+            return build_absolute_uri(cover_storage.url(row['cover']))
+
+        renderers = {
+            'category': lambda row, tags: row['category__name'],
+            'tags': lambda row, tags: [tag_id for tag_id, _, _ in tags],
+            'public': lambda row, tags: row['is_published'],
+            'preparation': lambda row, tags: (
+                f'{row["preparation_time"]} {row["preparation_time_unit"]}'
+            ),
+            'tag_objects': lambda row, tags: [
+                {'id': tag_id, 'name': name, 'slug': slug}
+                for tag_id, name, slug in tags
+            ],
+            'tag_links': lambda row, tags: [
+                f'{link_start}{tag_id}{link_end}' for tag_id, _, _ in tags
+            ],
+            'cover': get_cover,
+        }
+
+        expanded_renderers = {
+            'author': lambda row, tags: None if row['author'] is None else {
+                'id': row['author'],
+                'username': row['author__username'],
+                'first_name': row['author__first_name'],
+                'last_name': row['author__last_name'],
+            },
+            'category': lambda row, tags: None if row['category'] is None else {
+                'id': row['category'],
+                'name': row['category__name'],
+            },
+            'tags': renderers['tag_objects'],
+        }
+
+        return [
+            (
+                field,
+                expanded_renderers[field] if field in self.expand
+                else renderers.get(field) or column(field)
+            )
+            for field in self.fields
+        ]
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        tags = {}
+
+        if self.tag_fields.intersection(self.fields):
+            tags = self.get_tags([row['id'] for row in rows])
+
+        renderers = self.get_renderers()
+
+        return [
+            {
+                field: render(row, tags.get(row['id'], ()))
+                for field, render in renderers
+            }
+            for row in rows
+        ]
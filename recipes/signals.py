@@ -1,34 +1,329 @@
 import os
 
-from django.db.models.signals import pre_delete, pre_save
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
+from django.utils import timezone
 
-from recipes.models import Recipe
+from recipes.cache import get_recipe_page_groups, invalidate_cache_groups
+from recipes.catalog import invalidate_catalog
+from recipes.counts import adjust_published_counts, get_count_scopes
+from recipes.models import Category, CoverFile, Recipe
+from recipes.search import index_recipe, unindex_recipe
+from recipes.storage import is_content_addressed
+from recipes.suggest import record_suggestion_changes
+from tag.models import Tag
+from utils.img_recize import get_variant_names
 
 
-def delete_cover(instance):
-    try:
-        os.remove(instance.cover.path)
-    except (ValueError, FileNotFoundError):
-        ...
+def delete_cover_files(storage, names):
+    for name in names:
+        try:
+            os.remove(storage.path(name))
+        except FileNotFoundError:
+            ...
+
+
+def delete_unreferenced_cover(storage, name, names):
+    # Content-addressed covers are shared, kept until no recipe counts one.
+    # Removed under the row lock, an upload reusing the file waits for it.
+    with transaction.atomic():
+        if is_content_addressed(name):
+            cover_file = CoverFile.objects.select_for_update().filter(
+                name=name
+            ).first()
+
+            if cover_file is not None:
+                if cover_file.refs > 0:
+                    return
+
+                cover_file.delete()
+
+        delete_cover_files(storage, names)
+
+
+def delete_cover(storage, name, variants):
+    names = [
+        cover_name for cover_name in [name, *get_variant_names(variants or {})]
+        if cover_name
+    ]
+
+    if is_content_addressed(name):
+        # In the transaction of the save or delete that drops the reference
+        CoverFile.objects.release(name)
+
+    # A rolled back save or delete must keep its files
+    if names:
+        transaction.on_commit(
+            lambda: delete_unreferenced_cover(storage, name, names)
+        )
 
 
 @receiver(pre_delete, sender=Recipe)
 def recipe_cover_delete(sender, instance, *args, **kwargs):
-    old_instance = Recipe.objects.filter(pk=instance.pk).first()
-
-    if old_instance:
-        delete_cover(old_instance)
+    delete_cover(
+        instance.cover.storage,
+        instance.get_loaded_value('cover', instance.cover.name),
+        instance.get_loaded_value('cover_variants', instance.cover_variants),
+    )
 
 
 @receiver(pre_save, sender=Recipe)
 def recipe_cover_update(sender, instance, *args, **kwargs):
-    old_instance = Recipe.objects.filter(pk=instance.pk).first()
+    if 'cover' not in instance.changed_fields:
+        return
 
-    if not old_instance:
+    # Nothing is stored for a new recipe
+    if instance.get_loaded_value('cover') is None:
         return
 
-    is_new_cover = old_instance.cover != instance.cover
+    delete_cover(
+        instance.cover.storage,
+        instance.get_loaded_value('cover'),
+        instance.get_loaded_value('cover_variants'),
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_search_index_update(sender, instance, created, *args, **kwargs):
+    if created or instance.changed_fields & {
+        'title', 'description', 'preparation_steps'
+    }:
+        index_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_search_index_delete(sender, instance, *args, **kwargs):
+    unindex_recipe(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_suggestion_update(sender, instance, created, *args, **kwargs):
+    if not created and not instance.changed_fields & {'title', 'is_published'}:
+        return
+
+    if instance.is_published:
+        change = ('recipe', instance.pk, instance.title, instance.pk)
+    else:
+        change = ('recipe', instance.pk, None, None)
+
+    record_suggestion_changes([change])
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_suggestion_delete(sender, instance, *args, **kwargs):
+    record_suggestion_changes([('recipe', instance.pk, None, None)])
+
+
+@receiver(post_save, sender=Tag)
+def tag_suggestion_update(sender, instance, *args, **kwargs):
+    record_suggestion_changes(
+        [('tag', instance.pk, instance.name, instance.slug)]
+    )
+
+
+@receiver(post_delete, sender=Tag)
+def tag_suggestion_delete(sender, instance, *args, **kwargs):
+    record_suggestion_changes([('tag', instance.pk, None, None)])
+
+
+def invalidate_recipe_pages(recipe_ids=(), category_ids=(), tag_slugs=()):
+    groups = get_recipe_page_groups(
+        category_ids=category_ids,
+        tag_slugs=tag_slugs,
+        recipe_ids=recipe_ids,
+    )
+    transaction.on_commit(lambda: invalidate_cache_groups(groups))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_pages_update(sender, instance, created, *args, **kwargs):
+    changed_fields = instance.changed_fields
+    was_published = not created and instance.get_loaded_value('is_published')
+
+    # Drafts are not on any public page
+    if not instance.is_published and not was_published:
+        return
+
+    if not created and not changed_fields:
+        return
+
+    category_ids = {instance.category_id}
+
+    if not created:
+        category_ids.add(instance.get_loaded_value('category_id'))
+
+    invalidate_recipe_pages(
+        recipe_ids=[instance.pk],
+        category_ids=category_ids,
+        tag_slugs=instance.tags.values_list('slug', flat=True),
+    )
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_pages_delete(sender, instance, *args, **kwargs):
+    if not instance.is_published:
+        return
+
+    invalidate_recipe_pages(
+        recipe_ids=[instance.pk],
+        category_ids=[instance.category_id],
+        tag_slugs=list(instance.tags.values_list('slug', flat=True)),
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_pages_update(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        recipes = instance.recipe_set.all()
+        if pk_set is not None:
+            recipes = Recipe.objects.filter(pk__in=pk_set)
+        tags = Tag.objects.filter(pk=instance.pk)
+    else:
+        recipes = Recipe.objects.filter(pk=instance.pk)
+        tags = Tag.objects.filter(pk__in=pk_set) if pk_set else instance.tags
+
+    recipes = list(
+        recipes.filter(is_published=True).values_list('id', 'category_id')
+    )
+
+    if not recipes:
+        return
+
+    invalidate_recipe_pages(
+        recipe_ids=[recipe_id for recipe_id, _ in recipes],
+        category_ids={category_id for _, category_id in recipes},
+        tag_slugs=list(tags.values_list('slug', flat=True)),
+    )
+
+
+def touch_recipe_pages(recipes, category_ids=(), tag_slugs=()):
+    # update() skips the save signals; updated_at is bumped so the cached
+    # cards, pages and ETags of the recipes pick up the new name
+    recipe_ids = list(recipes.filter(is_published=True).values_list(
+        'id', flat=True
+    ))
+    Recipe.objects.filter(pk__in=recipe_ids).update(updated_at=timezone.now())
+    invalidate_recipe_pages(
+        recipe_ids=recipe_ids,
+        category_ids=category_ids,
+        tag_slugs=tag_slugs,
+    )
+
+
+# Names are shown on the pages of every recipe using them. Deletes are
+# handled before the recipes are detached from the category or tag.
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_pages_update(sender, instance, created=False, *args, **kwargs):
+    transaction.on_commit(invalidate_catalog)
+
+    # A new category is on no page yet
+    if created:
+        return
+
+    recipes = Recipe.objects.filter(category_id=instance.pk)
+    touch_recipe_pages(
+        recipes,
+        category_ids=[instance.pk],
+        tag_slugs=list(recipes.filter(
+            is_published=True, tags__isnull=False
+        ).values_list('tags__slug', flat=True).distinct()),
+    )
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def tag_pages_update(sender, instance, created=False, *args, **kwargs):
+    transaction.on_commit(invalidate_catalog)
+
+    if created:
+        return
+
+    touch_recipe_pages(instance.recipe_set.all(), tag_slugs=[instance.slug])
+
+
+def adjust_counts(delta, category_ids=(), tag_ids=(), include_home=True):
+    scopes = get_count_scopes(
+        category_ids=category_ids,
+        tag_ids=tag_ids,
+        include_home=include_home,
+    )
+    transaction.on_commit(lambda: adjust_published_counts(scopes, delta))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_counts_update(sender, instance, created, *args, **kwargs):
+    was_published = not created and instance.get_loaded_value('is_published')
+    previous_category_id = instance.get_loaded_value('category_id')
+
+    if was_published and instance.is_published:
+        if previous_category_id != instance.category_id:
+            adjust_counts(-1, [previous_category_id], include_home=False)
+            adjust_counts(1, [instance.category_id], include_home=False)
+        return
+
+    if was_published == instance.is_published:
+        return
+
+    # A new recipe has no tags yet, they arrive through m2m_changed
+    tag_ids = [] if created else list(
+        instance.tags.values_list('id', flat=True)
+    )
+
+    if instance.is_published:
+        adjust_counts(1, [instance.category_id], tag_ids)
+    else:
+        adjust_counts(-1, [previous_category_id], tag_ids)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_counts_delete(sender, instance, *args, **kwargs):
+    if not instance.is_published:
+        return
+
+    adjust_counts(
+        -1,
+        [instance.category_id],
+        list(instance.tags.values_list('id', flat=True)),
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_counts_update(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    delta = 1 if action == 'post_add' else -1
+
+    if reverse:
+        recipes = instance.recipe_set.all()
+        if pk_set is not None:
+            recipes = Recipe.objects.filter(pk__in=pk_set)
+        published = recipes.filter(is_published=True).count()
+
+        if published:
+            adjust_counts(
+                delta * published, tag_ids=[instance.pk], include_home=False
+            )
+        return
+
+    if not instance.is_published:
+        return
+
+    tag_ids = pk_set
+
+    if tag_ids is None:
+        tag_ids = list(instance.tags.values_list('id', flat=True))
 
-    if is_new_cover:
-        delete_cover(old_instance)
+    adjust_counts(delta, tag_ids=tag_ids, include_home=False)
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+CONTENT_ADDRESSED_DIR = 'recipes/covers/sha256/'
+# How long a saved or reused cover may still belong to a transaction in
+# flight, cleanup_covers keeps newer files
+UPLOAD_GRACE_SECONDS = 3600
+
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CONTENT_ADDRESSED_DIR)
+
+
+def cover_upload_to(instance, filename):
+    if settings.RECIPES_COVER_DEDUP:
+        # The storage replaces the file name with the hash of its content
+        return CONTENT_ADDRESSED_DIR + filename
+
+    return posixpath.join(
+        timezone.now().strftime('recipes/covers/%Y/%m/%d/'), filename
+    )
+
+
+@deconstructible
+class CoverStorage(FileSystemStorage):
+    # Names under CONTENT_ADDRESSED_DIR are stored once per content, as
+    # sha256/ab/cd/abcd...ext, other names are stored as usual
+
+    def save(self, name, content, max_length=None):
+        if not is_content_addressed(name):
+            return super().save(name, content, max_length=max_length)
+
+        directory = self.path(CONTENT_ADDRESSED_DIR)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+
+        try:
+            # Hashed while it is written, the upload is read once
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            extension = os.path.splitext(name)[1].lower()
+            name = (
+                f'{CONTENT_ADDRESSED_DIR}{hexdigest[:2]}/{hexdigest[2:4]}/'
+                f'{hexdigest}{extension}'
+            )
+            full_path = self.path(name)
+
+            # Counted before the file is looked at. The row stays locked
+            # until the recipe is committed, the delete of the last recipe
+            # using the file waits for it or has already removed the file.
+            from recipes.models import CoverFile
+            CoverFile.objects.acquire(name)
+
+            try:
+                # A reused file counts as saved now, for cleanup_covers
+                os.utime(full_path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                # Atomic, a concurrent upload of the same content is harmless
+                os.replace(temp_path, full_path)
+            else:
+                os.remove(temp_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return name
+
+
+cover_storage = CoverStorage()
@@ -0,0 +1,202 @@
+import threading
+from bisect import bisect_left, insort
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+
+from recipes.cache import bump_group_version, get_group_version
+from utils.strings import fold_text
+
+
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_GROUP = 'suggestions'
+# Changes kept for the other workers to replay, a worker further behind
+# loads the whole index again
+SUGGEST_LOG_TIMEOUT = 60 * 60
+SUGGEST_MAX_REPLAY = 500
+
+
+class PrefixIndex:
+    # Sorted list of (folded label, kind, id) searched with bisect. It is
+    # built on first use and kept up to date with the changes committed by
+    # every worker: each one moves the shared version of its cache group and
+    # is logged under the new version, for the other workers to replay.
+    def __init__(self, loader, group):
+        self._loader = loader
+        self._group = group
+        self._lock = threading.RLock()
+        self._keys = None
+        self._entries = {}
+        self._version = None
+
+    @property
+    def is_loaded(self):
+        return self._keys is not None
+
+    def get_log_key(self, version):
+        return f'recipes:suggest:{self._group}:{version}'
+
+    def load(self):
+        version = get_group_version(self._group)
+
+        with self._lock:
+            if self.is_loaded and self._version == version:
+                return
+
+            if self.is_loaded and self._replay(version):
+                return
+
+            self._keys = []
+            self._entries = {}
+
+            for kind, pk, label, url_arg in self._loader():
+                self._entries[(kind, pk)] = (fold_text(label), label, url_arg)
+
+            self._keys = sorted(
+                (key, kind, pk)
+                for (kind, pk), (key, _, _) in self._entries.items()
+            )
+            self._version = version
+
+    def _replay(self, version):
+        missed = range(self._version + 1, version + 1)
+
+        if not 0 < len(missed) <= SUGGEST_MAX_REPLAY:
+            return False
+
+        log_keys = [self.get_log_key(missed_at) for missed_at in missed]
+        logs = cache.get_many(log_keys)
+
+        # Expired, or not written yet by the worker that moved the version
+        if len(logs) != len(log_keys):
+            return False
+
+        for log_key in log_keys:
+            self.apply(logs[log_key])
+
+        self._version = version
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._keys = None
+            self._entries = {}
+            self._version = None
+
+    def apply(self, changes):
+        # Changes are (kind, pk, label, url_arg), without a label to discard
+        with self._lock:
+            for kind, pk, label, url_arg in changes:
+                if label is None:
+                    self.discard(kind, pk)
+                else:
+                    self.add(kind, pk, label, url_arg)
+
+    def publish(self, changes):
+        version = bump_group_version(self._group)
+        cache.set(
+            self.get_log_key(version), changes, timeout=SUGGEST_LOG_TIMEOUT
+        )
+
+        with self._lock:
+            # Missed changes of other workers are replayed in order first,
+            # by the next search
+            if self.is_loaded and self._version == version - 1:
+                self.apply(changes)
+                self._version = version
+
+    def add(self, kind, pk, label, url_arg):
+        with self._lock:
+            if not self.is_loaded:
+                return
+
+            self._discard(kind, pk)
+            key = fold_text(label)
+            self._entries[(kind, pk)] = (key, label, url_arg)
+            insort(self._keys, (key, kind, pk))
+
+    def discard(self, kind, pk):
+        with self._lock:
+            if self.is_loaded:
+                self._discard(kind, pk)
+
+    def _discard(self, kind, pk):
+        entry = self._entries.pop((kind, pk), None)
+
+        if entry is None:
+            return
+
+        key = (entry[0], kind, pk)
+        index = bisect_left(self._keys, key)
+
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def search(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = fold_text(prefix)
+
+        if not prefix:
+            return []
+
+        results = []
+
+        with self._lock:
+            self.load()
+            index = bisect_left(self._keys, (prefix,))
+
+            while index < len(self._keys) and len(results) < limit:
+                key, kind, pk = self._keys[index]
+
+                if not key.startswith(prefix):
+                    break
+
+                _, label, url_arg = self._entries[(kind, pk)]
+                results.append((kind, pk, label, url_arg))
+                index += 1
+
+        return results
+
+
+def load_suggestions():
+    from recipes.models import Recipe
+    from tag.models import Tag
+
+    for pk, title in Recipe.objects.filter(
+        is_published=True
+    ).values_list('id', 'title').iterator():
+        yield 'recipe', pk, title, pk
+
+    for pk, name, slug in Tag.objects.values_list(
+        'id', 'name', 'slug'
+    ).iterator():
+        yield 'tag', pk, name, slug
+
+
+suggestion_index = PrefixIndex(load_suggestions, SUGGEST_GROUP)
+
+
+def record_suggestion_changes(changes):
+    # Published when the changes are committed, a rolled back save leaves
+    # the index as it was
+    transaction.on_commit(partial(suggestion_index.publish, list(changes)))
+
+
+SUGGESTION_URL_NAMES = {
+    'recipe': 'recipes:recipe',
+    'tag': 'recipes:tag',
+}
+
+
+def get_suggestions(prefix, limit=SUGGEST_LIMIT):
+    return [
+        {
+            'type': kind,
+            'id': pk,
+            'label': label,
+            'url': reverse(SUGGESTION_URL_NAMES[kind], args=(url_arg,)),
+        }
+        for kind, pk, label, url_arg in suggestion_index.search(prefix, limit)
+    ]
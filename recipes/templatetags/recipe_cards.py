@@ -0,0 +1,55 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+
+register = template.Library()
+
+CARD_TEMPLATE = 'recipes/partials/recipe.html'
+
+
+def make_card_cache_key(recipe):
+    return ':'.join((
+        'recipes:card',
+        str(recipe.pk),
+        str(recipe.updated_at.timestamp()),
+        translation.get_language() or '',
+    ))
+
+
+def render_card(recipe):
+    return get_template(CARD_TEMPLATE).render({'recipe': recipe})
+
+
+@register.simple_tag
+def recipe_card(recipe):
+    cache_key = make_card_cache_key(recipe)
+    html = cache.get(cache_key)
+
+    if html is None:
+        html = render_card(recipe)
+        cache.set(cache_key, html, settings.RECIPES_FRAGMENT_CACHE_TIMEOUT)
+
+    return mark_safe(html)
+
+
+@register.simple_tag
+def recipe_cards(recipes):
+    # The whole list costs a single get_many, only the missing cards are
+    # rendered and they are written back with a single set_many.
+    cache_keys = [(make_card_cache_key(recipe), recipe) for recipe in recipes]
+    cards = cache.get_many([cache_key for cache_key, _ in cache_keys])
+    missing = {
+        cache_key: render_card(recipe)
+        for cache_key, recipe in cache_keys
+        if cache_key not in cards
+    }
+
+    if missing:
+        cache.set_many(missing, settings.RECIPES_FRAGMENT_CACHE_TIMEOUT)
+        cards.update(missing)
+
+    return mark_safe(''.join(cards[cache_key] for cache_key, _ in cache_keys))
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+from utils.benchmark import compare_results
+
+
+class CompareResultsTest(TestCase):
+    def setUp(self):
+        self.baseline = {
+            '1000': {
+                'home': {'p50': 10.0, 'queries': 2.0},
+                'detail': {'p50': 0.2, 'queries': 3.0},
+            },
+        }
+        return super().setUp()
+
+    def test_compare_results_reports_slowdowns_over_the_threshold(self):
+        results = {'1000': {'home': {'p50': 13.0, 'queries': 2.0}}}
+        regressions = compare_results(results, self.baseline, threshold=20)
+        self.assertEqual(regressions, ['1000 home: p50 10.0ms -> 13.0ms'])
+
+    def test_compare_results_ignores_slowdowns_within_the_threshold(self):
+        results = {'1000': {'home': {'p50': 11.5, 'queries': 2.0}}}
+        self.assertEqual(compare_results(results, self.baseline), [])
+
+    def test_compare_results_ignores_tiny_absolute_slowdowns(self):
+        results = {'1000': {'detail': {'p50': 0.4, 'queries': 3.0}}}
+        self.assertEqual(compare_results(results, self.baseline), [])
+
+    def test_compare_results_reports_extra_queries(self):
+        results = {'1000': {'detail': {'p50': 0.2, 'queries': 4.0}}}
+        regressions = compare_results(results, self.baseline)
+        self.assertEqual(regressions, ['1000 detail: queries 3.0 -> 4.0'])
+
+    def test_compare_results_skips_endpoints_missing_from_the_baseline(self):
+        results = {'10000': {'home': {'p50': 99.0, 'queries': 9.0}}}
+        self.assertEqual(compare_results(results, self.baseline), [])
@@ -1,13 +1,44 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
-from utils.img_recize import img_recize
+from utils.img_recize import (
+    ImageTooLarge,
+    InvalidImage,
+    get_variant_names,
+    img_recize,
+    make_cover_variants,
+    open_image,
+)
 from PIL import Image
 import io
+import shutil
+import struct
+import tempfile
+import zlib
 from pathlib import Path
 from django.conf import settings
 
+
+def forge_png_header(width, height):
+    # A PNG that only claims its size, no pixel data follows
+    def chunk(kind, data):
+        return (
+            struct.pack('>I', len(data)) + kind + data +
+            struct.pack('>I', zlib.crc32(kind + data))
+        )
+
+    return b'\x89PNG\r\n\x1a\n' + chunk(
+        b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    ) + chunk(b'IEND', b'')
+
+
 class ImgRecizeTest(TestCase):
     def setUp(self):
+        # Files are written to a temporary MEDIA_ROOT
+        media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
         # Create a image in memory for testing
         self.img_width = 1200
         self.img_height = 600
@@ -72,4 +103,95 @@ class ImgRecizeTest(TestCase):
         # Test if the function returns a PIL.Image.Image object
         result = img_recize(self.django_image, new_width=800)
         self.assertTrue(hasattr(result, 'size'))
-        self.assertEqual(result.width, 800)
\ No newline at end of file
+        self.assertEqual(result.width, 800)
+
+    def test_make_cover_variants_never_upscales(self):
+        manifest = make_cover_variants(self.django_image, widths=(320, 2000))
+
+        self.assertEqual(
+            [variant['width'] for variant in manifest['webp']],
+            [320, self.img_width]
+        )
+        self.assertEqual(manifest['fallback']['width'], 840)
+
+        for name in get_variant_names(manifest):
+            with Image.open(Path(settings.MEDIA_ROOT) / name) as img:
+                self.assertIn(img.format, ('WEBP', 'JPEG'))
+            (Path(settings.MEDIA_ROOT) / name).unlink()
+
+    def save_media_image(self, name, size, image_format='JPEG', exif=None):
+        image = Image.new('RGB', size, color='green')
+        media_path = Path(settings.MEDIA_ROOT) / name
+        image.save(media_path, image_format, exif=exif or Image.Exif())
+        self.addCleanup(media_path.unlink)
+        return SimpleUploadedFile(name=name, content=b'')
+
+    def cleanup_variants(self, manifest):
+        for name in get_variant_names(manifest):
+            (Path(settings.MEDIA_ROOT) / name).unlink()
+
+    @override_settings(COVER_MAX_PIXELS=1000)
+    def test_open_image_rejects_images_over_the_pixel_limit(self):
+        with self.assertRaises(ImageTooLarge):
+            make_cover_variants(self.django_image)
+
+    def test_open_image_rejects_decompression_bombs(self):
+        # Pillow raises on headers over twice Image.MAX_IMAGE_PIXELS,
+        # before the COVER_MAX_PIXELS check
+        media_path = Path(settings.MEDIA_ROOT) / 'bomb.png'
+        media_path.write_bytes(forge_png_header(20000, 10000))
+        self.addCleanup(media_path.unlink)
+
+        with self.assertRaises(ImageTooLarge):
+            with open_image(media_path):
+                ...
+
+    def test_open_image_rejects_truncated_and_missing_files(self):
+        media_path = Path(settings.MEDIA_ROOT) / 'truncated.jpg'
+        media_path.write_bytes(self.django_image.read()[:2000])
+
+        for path in (media_path, Path(settings.MEDIA_ROOT) / 'missing.jpg'):
+            with self.assertRaises(InvalidImage):
+                with open_image(path):
+                    ...
+
+    @override_settings(COVER_MAX_BYTES=10)
+    def test_open_image_rejects_files_over_the_byte_limit(self):
+        with self.assertRaises(ImageTooLarge):
+            img_recize(self.django_image)
+
+    def test_make_cover_variants_decodes_large_jpegs_in_draft_mode(self):
+        large_image = self.save_media_image('large_image.jpg', (5120, 2560))
+
+        with open_image(Path(settings.MEDIA_ROOT) / 'large_image.jpg', 1280) as (image, scale):
+            self.assertEqual(image.size, (1280, 640))
+            self.assertEqual(scale, 0.25)
+
+        manifest = make_cover_variants(large_image)
+        self.cleanup_variants(manifest)
+        self.assertEqual(
+            [(variant['width'], variant['height']) for variant in manifest['webp']],
+            [(320, 160), (640, 320), (840, 420), (1280, 640)]
+        )
+
+    def test_make_cover_variants_reduces_large_pngs(self):
+        large_image = self.save_media_image('large_image.png', (5120, 2560), 'PNG')
+
+        with open_image(Path(settings.MEDIA_ROOT) / 'large_image.png', 1280) as (image, scale):
+            self.assertEqual(image.size, (1280, 640))
+
+        manifest = make_cover_variants(large_image)
+        self.cleanup_variants(manifest)
+        self.assertEqual(manifest['webp'][-1]['width'], 1280)
+
+    def test_make_cover_variants_uses_the_rotated_width(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        rotated_image = self.save_media_image('rotated_image.jpg', (4000, 2000), exif=exif)
+
+        manifest = make_cover_variants(rotated_image)
+        self.cleanup_variants(manifest)
+        self.assertEqual(
+            [(variant['width'], variant['height']) for variant in manifest['webp']],
+            [(320, 640), (640, 1280), (840, 1680), (1280, 2560)]
+        )
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from recipes.models import Recipe
 from django.urls import reverse
-from utils.pagination import make_pagination_range
+from utils.pagination import make_pagination_range, encode_cursor, KeysetPage
 
 
 class PaginationTest(TestCase):
@@ -54,4 +57,79 @@ class PaginationTest(TestCase):
     def test_pagination_invalid_page_returns_404(self):
         url = reverse('recipes:home')
         response = self.client.get(f'{url}?page=999')
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        recipes = [
+            Recipe(
+                title=f'Recipe {i}',
+                slug=f'recipe-{i}',
+                description='Description',
+                preparation_time=10,
+                preparation_time_unit='Minutes',
+                servings=5,
+                servings_unit='People',
+                preparation_steps='Steps',
+                is_published=True,
+            ) for i in range(10)
+        ]
+        Recipe.objects.bulk_create(recipes)
+        self.ids = list(
+            Recipe.objects.order_by('-id').values_list('id', flat=True)
+        )
+
+    def get_home(self, query=''):
+        with patch('recipes.views.site.PER_PAGE', new=3), \
+                patch('recipes.views.site.PAGINATION_MODE', new='keyset'):
+            return self.client.get(reverse('recipes:home') + query)
+
+    def test_keyset_pagination_walks_all_recipes_forward(self):
+        seen = []
+        query = ''
+
+        while True:
+            page = self.get_home(query).context['recipes']
+            seen += [recipe.id for recipe in page]
+
+            if not page.has_next():
+                break
+
+            query = f'?after={page.next_cursor}'
+
+        self.assertEqual(self.ids, seen)
+
+    def test_keyset_pagination_before_cursor_returns_previous_page(self):
+        first_page = self.get_home().context['recipes']
+        second_page = self.get_home(
+            f'?after={first_page.next_cursor}'
+        ).context['recipes']
+        previous_page = self.get_home(
+            f'?before={second_page.previous_cursor}'
+        ).context['recipes']
+
+        self.assertEqual(
+            [recipe.id for recipe in first_page],
+            [recipe.id for recipe in previous_page],
+        )
+        self.assertFalse(previous_page.has_previous())
+        self.assertTrue(previous_page.has_next())
+
+    def test_keyset_pagination_does_not_count_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get_home(f'?after={encode_cursor(self.ids[5])}')
+
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    def test_keyset_pagination_invalid_cursor_returns_404(self):
+        response = self.get_home('?after=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_in_query_string_enables_keyset_pagination(self):
+        response = self.client.get(
+            reverse('recipes:home') + f'?after={encode_cursor(self.ids[0])}'
+        )
+        self.assertIsInstance(response.context['recipes'], KeysetPage)
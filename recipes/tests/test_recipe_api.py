@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import test
 from recipes.tests.test_recipe_base import RecipeMixing
 from django.urls import reverse
@@ -165,4 +167,70 @@ class RecipeAPIv2Test(test.APITestCase, RecipeAPIv2TestMixin):
             response.status_code,
             403
         )
-        
\ No newline at end of file
+        
+
+class RecipeAPIv2CursorPaginationTest(test.APITestCase, RecipeAPIv2TestMixin):
+    def setUp(self):
+        self.ids = sorted(
+            (recipe.id for recipe in self.make_recipe_in_bath(qtd=8)),
+            reverse=True
+        )
+        return super().setUp()
+
+    def get_ids(self, response):
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_cursor_pages_follow_the_ids_in_descending_order(self):
+        response = self.client.get(
+            self.get_recipe_reverse_url(), data={'pagination': 'cursor'}
+        )
+        self.assertEqual(self.get_ids(response), self.ids[:5])
+        self.assertNotIn('count', response.data)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.get_ids(response), self.ids[5:])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_recipes_published_mid_scroll_do_not_shift_the_next_page(self):
+        response = self.client.get(
+            self.get_recipe_reverse_url(), data={'pagination': 'cursor'}
+        )
+        self.make_recipe(
+            author_data={'username': 'late'}, slug='late', title='Late'
+        )
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.get_ids(response), self.ids[5:])
+
+    def test_cursor_pagination_skips_offset_and_count(self):
+        url = self.get_recipe_reverse_url()
+        # The list ETag caches the published count on the first request
+        response = self.client.get(url, data={'pagination': 'cursor'})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    @patch('recipes.views.api.RecipeAPIv2CursorPagination.max_page_size', new=6)
+    def test_page_size_is_chosen_by_the_client_up_to_the_maximum(self):
+        url = self.get_recipe_reverse_url()
+
+        response = self.client.get(url, data={'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(self.get_ids(response), self.ids[:2])
+
+        response = self.client.get(url, data={'pagination': 'cursor', 'page_size': 100})
+        self.assertEqual(self.get_ids(response), self.ids[:6])
+
+    @patch('recipes.views.api.API_PAGINATION_MODE', new='cursor')
+    def test_cursor_pagination_can_be_the_default(self):
+        response = self.get_recipe_api_list()
+        self.assertIn('cursor=', response.data['next'])
+
+        response = self.client.get(
+            self.get_recipe_reverse_url(), data={'pagination': 'page'}
+        )
+        self.assertEqual(response.data['count'], 8)
@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import test
+
+from recipes.models import Recipe
+from recipes.tests.test_recipe_api import RecipeAPIv2TestMixin
+from tag.models import Tag
+
+
+class RecipeAPIv2BatchTest(test.APITestCase, RecipeAPIv2TestMixin):
+    def setUp(self):
+        self.url = reverse('recipes:recipes-api-batch')
+        self.recipes = self.make_recipe_in_bath(qtd=4)
+        self.tag = Tag.objects.create(name='Doce', slug='doce')
+        self.recipes[0].tags.add(self.tag)
+        self.draft = self.make_recipe(
+            author_data={'username': 'draft'}, slug='draft', is_published=False
+        )
+        return super().setUp()
+
+    def get_batch(self, ids, **params):
+        return self.client.get(
+            self.url, data={'ids': ','.join(map(str, ids)), **params}
+        )
+
+    def test_batch_keeps_the_requested_order_and_reports_missing_ids(self):
+        ids = [self.recipes[2].id, 999, self.recipes[0].id, self.draft.id]
+        response = self.get_batch(ids)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [self.recipes[2].id, self.recipes[0].id]
+        )
+        self.assertEqual(response.data['missing'], [999, self.draft.id])
+
+    def test_batch_results_are_the_same_as_retrieve(self):
+        recipe = self.recipes[0]
+        response = self.get_batch([recipe.id])
+        detail = self.client.get(
+            reverse('recipes:recipes-api-detail', args=(recipe.id,))
+        )
+        self.assertEqual(response.data['results'], [detail.data])
+
+    def test_batch_uses_two_queries_for_any_number_of_ids(self):
+        # The recipes, then the tags of all of them
+        with self.assertNumQueries(2):
+            self.get_batch([recipe.id for recipe in self.recipes])
+
+    def test_batch_expands_author_category_and_tags(self):
+        recipe = self.recipes[0]
+        response = self.get_batch(
+            [recipe.id], expand='author,category,tags', fields='author,category,tags'
+        )
+
+        self.assertEqual(response.data['results'], [{
+            'author': {
+                'id': recipe.author.id,
+                'username': recipe.author.username,
+                'first_name': recipe.author.first_name,
+                'last_name': recipe.author.last_name,
+            },
+            'category': {
+                'id': recipe.category.id, 'name': recipe.category.name
+            },
+            'tags': [{'id': self.tag.id, 'name': 'Doce', 'slug': 'doce'}],
+        }])
+
+    def test_batch_expands_missing_relations_to_none(self):
+        recipe = self.recipes[1]
+        Recipe.objects.filter(pk=recipe.pk).update(author=None, category=None)
+        response = self.get_batch([recipe.id], expand='author,category')
+
+        self.assertIsNone(response.data['results'][0]['author'])
+        self.assertIsNone(response.data['results'][0]['category'])
+
+    def test_batch_rejects_invalid_ids_and_expansions(self):
+        self.assertEqual(self.get_batch(['1', 'a']).status_code, 400)
+        self.assertEqual(self.get_batch([]).status_code, 400)
+        self.assertEqual(
+            self.get_batch([1], expand='email').status_code, 400
+        )
+
+    @patch('recipes.views.api.API_BATCH_MAX_IDS', new=2)
+    def test_batch_limits_the_number_of_ids(self):
+        self.assertEqual(self.get_batch([1, 2, 3]).status_code, 400)
+        # Repeated ids count once
+        self.assertEqual(self.get_batch([1, 2, 1]).status_code, 200)
@@ -0,0 +1,153 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import test
+
+from recipes.bulk import bulk_create_recipes
+from recipes.counts import get_published_count
+from recipes.models import Recipe
+from recipes.search import search_recipes
+from recipes.suggest import suggestion_index
+from recipes.tests.test_recipe_api import RecipeAPIv2TestMixin
+from tag.models import Tag
+
+
+class RecipeAPIv2BulkCreateTest(test.APITestCase, RecipeAPIv2TestMixin):
+    def setUp(self):
+        self.url = reverse('recipes:recipes-api-bulk')
+        self.author = self.make_author(username='importer')
+        self.client.force_authenticate(user=self.author)
+        self.tags = [
+            Tag.objects.create(name=f'Tag {i}', slug=f'tag-{i}')
+            for i in range(2)
+        ]
+        return super().setUp()
+
+    def get_items(self, qty=3):
+        return [
+            {
+                **self.get_recipe_raw_data(),
+                'title': f'Imported recipe {i}',
+                'tags': [tag.id for tag in self.tags[:i]],
+            }
+            for i in range(qty)
+        ]
+
+    def test_bulk_create_creates_every_recipe_with_its_tags(self):
+        response = self.client.post(self.url, data=self.get_items(), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [recipe['title'] for recipe in response.data],
+            ['Imported recipe 0', 'Imported recipe 1', 'Imported recipe 2']
+        )
+        self.assertEqual(response.data[2]['tags'], [tag.id for tag in self.tags])
+
+        recipe = Recipe.objects.get(title='Imported recipe 1')
+        self.assertEqual(recipe.author, self.author)
+        self.assertEqual(recipe.title_normalized, 'imported recipe 1')
+        self.assertTrue(recipe.slug.startswith('imported-recipe-1-'))
+        self.assertFalse(recipe.is_published)
+
+    def test_bulk_create_uses_a_fixed_number_of_queries(self):
+        # Checks, inserts, search index and response do not grow per recipe
+        with self.assertNumQueries(9):
+            self.client.post(self.url, data=self.get_items(3), format='json')
+
+        with self.assertNumQueries(9):
+            self.client.post(self.url, data=[
+                {**item, 'title': f'Other {item["title"]}'}
+                for item in self.get_items(20)
+            ], format='json')
+
+    def test_bulk_create_indexes_the_recipes_for_search(self):
+        items = self.get_items(1)
+        items[0]['title'] = 'Quindim importado'
+        self.client.post(self.url, data=items, format='json')
+
+        self.assertEqual(
+            list(search_recipes(Recipe.objects.all(), 'quindim').values_list(
+                'title', flat=True
+            )),
+            ['Quindim importado']
+        )
+
+    def test_bulk_create_reports_errors_per_recipe_and_creates_nothing(self):
+        self.make_recipe(title='Imported Recipe 0')
+        items = self.get_items(4)
+        items[1]['servings'] = -1
+        items[2]['tags'] = [999]
+        items[3]['title'] = 'IMPORTED récipe 1'
+
+        response = self.client.post(self.url, data=items, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('same title', response.data[0]['title'][0])
+        self.assertIn('servings', response.data[1])
+        self.assertIn('999', response.data[2]['tags'][0])
+        self.assertEqual(response.data[3], {})
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_bulk_create_rejects_duplicate_titles_within_the_batch(self):
+        items = self.get_items(2)
+        items[1]['title'] = 'imported recipe 0'
+
+        response = self.client.post(self.url, data=items, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('title', response.data[1])
+
+    @patch('recipes.views.api.API_BULK_MAX_RECIPES', new=2)
+    def test_bulk_create_limits_the_number_of_recipes(self):
+        response = self.client.post(self.url, data=self.get_items(3), format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.url, data={}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_create_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, data=self.get_items(), format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class BulkCreateRecipesTest(test.APITestCase, RecipeAPIv2TestMixin):
+    def test_published_recipes_update_counts_and_suggestions(self):
+        category = self.make_category(name='Bulk')
+        tag = Tag.objects.create(name='Bulk tag', slug='bulk-tag')
+        author = self.make_author(username='bulk')
+        scopes = ('home', f'category:{category.id}', f'tag:{tag.id}')
+        counts = [get_published_count(scope) for scope in scopes]
+        suggestion_index.clear()
+        suggestion_index.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipes = bulk_create_recipes(
+                [
+                    Recipe(
+                        **{
+                            **self.get_recipe_raw_data(),
+                            'title': f'Bulk published {i}',
+                        },
+                        category=category,
+                        author=author,
+                        is_published=i < 2,
+                    )
+                    for i in range(3)
+                ],
+                [[tag.id, tag.id], [], [tag.id]],
+            )
+
+        self.assertEqual(
+            [get_published_count(scope) for scope in scopes],
+            [counts[0] + 2, counts[1] + 2, counts[2] + 1]
+        )
+        self.assertEqual(
+            [get_published_count(scope) for scope in scopes],
+            [Recipe.objects.filter(is_published=True).count(), 2, 1]
+        )
+        self.assertIn(
+            recipes[0].pk,
+            [match[1] for match in suggestion_index.search('bulk published', 10)]
+        )
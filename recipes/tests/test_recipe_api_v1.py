@@ -0,0 +1,69 @@
+import json
+
+from django.urls import reverse
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeAPIv1Test(RecipeTestBase):
+    def get_stream(self, stream_format):
+        response = self.client.get(
+            reverse('recipes:api_v1'), {'stream': stream_format}
+        )
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_recipe_api_v1_list_returns_the_page_recipes(self):
+        self.make_recipe_in_bath(qtd=2)
+        response = self.client.get(reverse('recipes:api_v1'))
+        self.assertEqual(len(response.json()), 2)
+        self.assertIn('preparation_steps', response.json()[0])
+
+    def test_recipe_api_v1_list_leaves_out_internal_columns(self):
+        self.make_recipe()
+        response = self.client.get(reverse('recipes:api_v1'))
+
+        for field in ('title_normalized', 'cover_status', 'cover_variants'):
+            self.assertNotIn(field, response.json()[0])
+
+    def test_recipe_api_v1_list_works_with_keyset_pagination(self):
+        recipes = self.make_recipe_in_bath(qtd=3)
+        response = self.client.get(
+            reverse('recipes:api_v1'), {'after': 'MTAwMA'}  # cursor of id 1000
+        )
+        self.assertEqual(
+            [recipe['id'] for recipe in response.json()],
+            [recipe.id for recipe in reversed(recipes)],
+        )
+
+    def test_recipe_api_v1_streams_all_published_recipes_as_ndjson(self):
+        recipes = self.make_recipe_in_bath(qtd=3)
+        recipes[0].is_published = False
+        recipes[0].save()
+
+        response, content = self.get_stream('ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [recipes[2].id, recipes[1].id],
+        )
+        self.assertNotIn('preparation_steps', rows[0])
+
+    def test_recipe_api_v1_streams_a_json_array(self):
+        self.make_recipe_in_bath(qtd=3)
+        _, content = self.get_stream('json')
+        self.assertEqual(len(json.loads(content)), 3)
+
+    def test_recipe_api_v1_empty_stream_is_valid_json(self):
+        _, content = self.get_stream('json')
+        self.assertEqual(json.loads(content), [])
+
+    def test_recipe_api_v1_stream_does_not_count_or_paginate(self):
+        self.make_recipe_in_bath(qtd=8)
+
+        with self.assertNumQueries(1):
+            _, content = self.get_stream('ndjson')
+
+        self.assertEqual(len(content.splitlines()), 8)
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from recipes.templatetags import recipe_cards
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeCardsFragmentCacheTest(RecipeTestBase):
+    def setUp(self) -> None:
+        cache.clear()
+        return super().setUp()
+
+    def test_recipe_cards_renders_the_recipe_partial(self):
+        recipes = self.make_recipe_in_bath(qtd=2)
+        expected = ''.join(
+            render_to_string('recipes/partials/recipe.html', {'recipe': recipe})
+            for recipe in recipes
+        )
+        self.assertEqual(expected, recipe_cards.recipe_cards(recipes))
+
+    def test_recipe_cards_only_renders_missing_cards(self):
+        recipes = self.make_recipe_in_bath(qtd=3)
+        recipe_cards.recipe_card(recipes[0])
+
+        with patch.object(
+            recipe_cards,
+            'render_card',
+            wraps=recipe_cards.render_card,
+        ) as render_card:
+            recipe_cards.recipe_cards(recipes)
+            recipe_cards.recipe_cards(recipes)
+
+        self.assertEqual(render_card.call_count, 2)
+
+    def test_recipe_cards_uses_one_cache_round_trip_per_list(self):
+        recipes = self.make_recipe_in_bath(qtd=6)
+        recipe_cards.recipe_cards(recipes)
+
+        with patch.object(cache, 'get_many', wraps=cache.get_many) as get_many, \
+                patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            recipe_cards.recipe_cards(recipes)
+
+        self.assertEqual(get_many.call_count, 1)
+        self.assertEqual(set_many.call_count, 0)
+
+    def test_recipe_cards_are_rendered_again_after_recipe_update(self):
+        recipe = self.make_recipe()
+        self.client.get(reverse('recipes:home'))
+
+        recipe.title = 'Updated recipe title'
+        recipe.save()
+        response = self.client.get(reverse('recipes:home'))
+
+        self.assertIn('Updated recipe title', response.content.decode())
@@ -0,0 +1,60 @@
+from django.urls import reverse
+
+from recipes.catalog import get_catalog
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeCatalogTest(RecipeTestBase):
+    def test_recipe_category_page_is_a_single_query(self):
+        recipe = self.make_recipe()
+        url = reverse('recipes:category', args=(recipe.category.id,))
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertIn(recipe.category.name, response.content.decode('utf-8'))
+
+    def test_recipe_tag_page_is_a_single_query(self):
+        recipe = self.make_recipe()
+        tag = Tag.objects.create(name='Doces', slug='doces')
+        recipe.tags.add(tag)
+        url = reverse('recipes:tag', args=(tag.slug,))
+        self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertIn('Doces - Tag', response.content.decode('utf-8'))
+        self.assertEqual(len(response.context['recipes']), 1)
+
+    def test_recipe_unknown_category_is_404_without_queries(self):
+        get_catalog()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('recipes:category', args=(999,))
+            )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_recipe_catalog_is_reloaded_when_a_category_changes(self):
+        category = self.make_category(name='Old name')
+        self.assertEqual(get_catalog().categories[category.id], 'Old name')
+
+        category.name = 'New name'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+
+        self.assertEqual(get_catalog().categories[category.id], 'New name')
+
+    def test_recipe_catalog_is_reloaded_when_a_tag_is_created(self):
+        get_catalog()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(name='Salgados', slug='salgados')
+
+        self.assertEqual(get_catalog().tags['salgados'], (tag.id, 'Salgados'))
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+
+from recipes.models import Recipe
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeCoverFilesTest(RecipeTestBase):
+    def setUp(self):
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return super().setUp()
+
+    def make_file(self, name, age=7200):
+        path = self.media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'cover')
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    def make_recipe_with_cover(self, cover, variants=None):
+        recipe = self.make_recipe()
+        Recipe.objects.filter(pk=recipe.pk).update(
+            cover=cover, cover_variants=variants or {}
+        )
+        return Recipe.objects.get(pk=recipe.pk)
+
+    def test_cover_is_kept_when_the_delete_is_rolled_back(self):
+        path = self.make_file('recipes/covers/kept.jpg')
+        recipe = self.make_recipe_with_cover('recipes/covers/kept.jpg')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    recipe.delete()
+                    raise RuntimeError()
+            except RuntimeError:
+                ...
+
+        self.assertTrue(path.exists())
+
+    def test_cover_is_deleted_after_the_delete_commits(self):
+        path = self.make_file('recipes/covers/gone.jpg')
+        recipe = self.make_recipe_with_cover('recipes/covers/gone.jpg')
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            recipe.delete()
+
+        self.assertTrue(path.exists())
+
+        for callback in callbacks:
+            callback()
+
+        self.assertFalse(path.exists())
+
+    def test_cleanup_covers_removes_only_old_unreferenced_files(self):
+        referenced = self.make_file('recipes/covers/2024/01/01/used.jpg')
+        variant = self.make_file('recipes/covers/2024/01/01/used_320w.webp')
+        orphan = self.make_file('recipes/covers/2024/01/01/orphan.jpg')
+        young = self.make_file('recipes/covers/2024/01/01/young.jpg', age=0)
+        self.make_recipe_with_cover(
+            'recipes/covers/2024/01/01/used.jpg',
+            {'webp': [{'name': 'recipes/covers/2024/01/01/used_320w.webp'}]},
+        )
+        output = StringIO()
+
+        call_command('cleanup_covers', stdout=output)
+
+        self.assertTrue(referenced.exists())
+        self.assertTrue(variant.exists())
+        self.assertTrue(young.exists())
+        self.assertFalse(orphan.exists())
+        self.assertIn('Removed 1 file(s)', output.getvalue())
+
+    def test_cleanup_covers_dry_run_keeps_the_files(self):
+        orphan = self.make_file('recipes/covers/orphan.jpg')
+        output = StringIO()
+
+        call_command('cleanup_covers', '--dry-run', stdout=output)
+
+        self.assertTrue(orphan.exists())
+        self.assertIn('recipes/covers/orphan.jpg', output.getvalue())
+        self.assertIn('Would remove 1 file(s)', output.getvalue())
@@ -0,0 +1,127 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import test
+
+from .test_recipe_base import RecipeMixing, RecipeTestBase
+
+
+class RecipeConditionalGetTest(RecipeTestBase):
+    def test_recipe_detail_sends_etag_and_last_modified(self):
+        recipe = self.make_recipe()
+        response = self.client.get(reverse('recipes:recipe', args=(recipe.id,)))
+        self.assertTrue(response['ETag'].startswith(f'"{recipe.id}-'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_recipe_detail_returns_304_with_a_single_query(self):
+        recipe = self.make_recipe()
+        url = reverse('recipes:recipe', args=(recipe.id,))
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_recipe_detail_etag_changes_when_recipe_is_updated(self):
+        recipe = self.make_recipe()
+        url = reverse('recipes:recipe', args=(recipe.id,))
+        etag = self.client.get(url)['ETag']
+
+        recipe.title = 'Updated title'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_recipe_detail_is_not_validated_for_logged_users(self):
+        recipe = self.make_recipe()
+        self.client.login(username='user', password='user')
+        response = self.client.get(reverse('recipes:recipe', args=(recipe.id,)))
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_recipe_api_v1_detail_returns_304_if_not_modified_since(self):
+        recipe = self.make_recipe()
+        url = reverse('recipes:api_v1_detail', args=(recipe.id,))
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_recipe_api_v1_list_etag_changes_when_a_recipe_is_deleted(self):
+        recipes = self.make_recipe_in_bath(qtd=2)
+        url = reverse('recipes:api_v1')
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipes[0].delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_recipe_detail_not_published_is_still_404(self):
+        recipe = self.make_recipe(is_published=False)
+        response = self.client.get(
+            reverse('recipes:recipe', args=(recipe.id,)),
+            HTTP_IF_NONE_MATCH='*',
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(RECIPES_PAGE_CACHE=True)
+    def test_recipe_detail_cached_page_also_returns_304(self):
+        cache.clear()
+        recipe = self.make_recipe()
+        url = reverse('recipes:recipe', args=(recipe.id,))
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class RecipeAPIv2ConditionalGetTest(test.APITestCase, RecipeMixing):
+    def test_recipe_api_v2_retrieve_returns_304_with_a_single_query(self):
+        recipe = self.make_recipe()
+        url = reverse('recipes:recipes-api-detail', args=(recipe.id,))
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_recipe_api_v2_list_returns_304_until_a_recipe_changes(self):
+        recipe = self.make_recipe()
+        url = reverse('recipes:recipes-api-list')
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        recipe.title = 'Updated title'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_recipe_api_v2_list_etag_does_not_query_the_recipes(self):
+        self.make_recipe()
+        url = reverse('recipes:recipes-api-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
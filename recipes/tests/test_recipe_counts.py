@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recipes.counts import count_published, get_published_count
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeCountsTest(RecipeTestBase):
+    def assertCountsAreExact(self, *scopes):
+        for scope in scopes:
+            self.assertEqual(
+                count_published(scope),
+                get_published_count(scope),
+                msg=f'Count for "{scope}" is out of date'
+            )
+
+    def change(self, func, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            return func(*args)
+
+    def test_recipe_counts_follow_publish_and_unpublish(self):
+        recipe = self.make_recipe()
+        category_scope = f'category:{recipe.category.id}'
+        self.assertEqual(get_published_count('home'), 1)
+        self.assertEqual(get_published_count(category_scope), 1)
+
+        recipe.is_published = False
+        self.change(recipe.save)
+        self.assertCountsAreExact('home', category_scope)
+
+        recipe.is_published = True
+        self.change(recipe.save)
+        self.assertCountsAreExact('home', category_scope)
+
+    def test_recipe_counts_follow_category_changes(self):
+        recipe = self.make_recipe()
+        old_category = recipe.category
+        new_category = self.make_category(name='New category')
+        get_published_count(f'category:{old_category.id}')
+        get_published_count(f'category:{new_category.id}')
+
+        recipe.category = new_category
+        self.change(recipe.save)
+
+        self.assertCountsAreExact(
+            'home',
+            f'category:{old_category.id}',
+            f'category:{new_category.id}',
+        )
+
+    def test_recipe_counts_follow_tags_changes(self):
+        recipe = self.make_recipe()
+        tag = Tag.objects.create(name='Doces', slug='doces')
+        tag_scope = f'tag:{tag.id}'
+        self.assertEqual(get_published_count(tag_scope), 0)
+
+        self.change(recipe.tags.add, tag)
+        self.assertCountsAreExact(tag_scope)
+
+        self.change(recipe.tags.clear)
+        self.assertCountsAreExact(tag_scope)
+
+        self.change(tag.recipe_set.add, recipe)
+        self.assertCountsAreExact(tag_scope)
+
+        self.change(recipe.delete)
+        self.assertCountsAreExact('home', tag_scope)
+
+    def test_recipe_home_pagination_does_not_count_rows(self):
+        self.make_recipe_in_bath(qtd=3)
+        get_published_count('home')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('recipes:home'))
+
+        self.assertEqual(response.context['recipes'].paginator.count, 3)
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
+
+    def test_recipe_search_count_is_capped(self):
+        self.make_recipe_in_bath(qtd=4)
+
+        with patch('recipes.views.site.SEARCH_COUNT_CAP', new=2):
+            response = self.client.get(reverse('recipes:search') + '?q=recipe')
+
+        self.assertEqual(response.context['search_count_label'], '2+')
+        self.assertIn('2+ results', response.content.decode('utf-8'))
+
+    @patch('recipes.views.site.PER_PAGE', new=1)
+    @patch('recipes.views.site.SEARCH_COUNT_CAP', new=2)
+    def test_recipe_search_pages_past_the_cap_exist(self):
+        self.make_recipe_in_bath(qtd=4)
+        url = reverse('recipes:search') + '?q=recipe&page='
+
+        response = self.client.get(url + '3')
+        self.assertEqual(response.context['search_count_label'], '2+')
+        self.assertTrue(response.context['recipes'].has_next())
+
+        response = self.client.get(url + '4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['search_count_label'], '2+')
+        self.assertFalse(response.context['recipes'].has_next())
+
+        self.assertEqual(self.client.get(url + '5').status_code, 404)
+
+    def test_recipe_api_v2_count_comes_from_the_counter(self):
+        self.make_recipe_in_bath(qtd=2)
+        get_published_count('home')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('recipes:recipes-api-list'))
+
+        self.assertEqual(response.json()['count'], 2)
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries)
+        )
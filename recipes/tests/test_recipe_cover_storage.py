@@ -0,0 +1,214 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import override_settings
+from PIL import Image
+
+from jobs.models import Job
+from jobs.queue import run_pending_jobs
+from recipes.models import CoverFile, Recipe
+from recipes.storage import CONTENT_ADDRESSED_DIR, UPLOAD_GRACE_SECONDS
+
+from .test_recipe_base import RecipeTestBase
+
+
+def make_upload(name='cover.jpg', color='red'):
+    image_bytes = io.BytesIO()
+    Image.new('RGB', (400, 200), color=color).save(image_bytes, format='JPEG')
+    return SimpleUploadedFile(name, image_bytes.getvalue(), 'image/jpeg')
+
+
+class RecipeCoverStorageTest(RecipeTestBase):
+    def setUp(self):
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, RECIPES_COVER_DEDUP=True
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.recipes = self.make_recipe_in_bath(qtd=2)
+        return super().setUp()
+
+    def save_cover(self, recipe, upload):
+        recipe = Recipe.objects.get(pk=recipe.pk)
+        recipe.cover = upload
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save()
+
+        return recipe
+
+    def get_stored_files(self):
+        return sorted(
+            path.relative_to(self.media_root).as_posix()
+            for path in self.media_root.rglob('*') if path.is_file()
+        )
+
+    def age_stored_files(self):
+        modified = time.time() - UPLOAD_GRACE_SECONDS - 60
+
+        for name in self.get_stored_files():
+            os.utime(self.media_root / name, (modified, modified))
+
+    def test_cover_is_stored_under_the_hash_of_its_content(self):
+        recipe = self.save_cover(self.recipes[0], make_upload('Photo.JPG'))
+
+        self.assertTrue(recipe.cover.name.startswith(CONTENT_ADDRESSED_DIR))
+        self.assertTrue(recipe.cover.name.endswith('.jpg'))
+        digest = Path(recipe.cover.name).stem
+        self.assertIn(f'/{digest[:2]}/{digest[2:4]}/', recipe.cover.name)
+        self.assertEqual(self.get_stored_files(), [recipe.cover.name])
+
+    def test_same_content_is_stored_and_processed_once(self):
+        first = self.save_cover(self.recipes[0], make_upload('a.jpg'))
+        run_pending_jobs()
+
+        with patch('recipes.jobs.make_cover_variants') as mock_variants:
+            second = self.save_cover(self.recipes[1], make_upload('b.jpg'))
+            run_pending_jobs()
+            mock_variants.assert_not_called()
+
+        first.refresh_from_db()
+        self.assertEqual(second.cover.name, first.cover.name)
+        self.assertEqual(second.cover_status, Recipe.COVER_READY)
+        self.assertEqual(second.cover_variants, first.cover_variants)
+        self.assertEqual(Job.objects.count(), 1)
+        # The original, its WebP variants and the JPEG fallback
+        self.assertEqual(len(self.get_stored_files()), 4)
+
+    def test_pending_job_processes_every_recipe_with_the_cover(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        second = self.save_cover(self.recipes[1], make_upload())
+        run_pending_jobs()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(first.cover_status, Recipe.COVER_READY)
+        self.assertEqual(second.cover_variants, first.cover_variants)
+
+    def test_different_content_gets_another_name(self):
+        first = self.save_cover(self.recipes[0], make_upload(color='red'))
+        second = self.save_cover(self.recipes[1], make_upload(color='blue'))
+        self.assertNotEqual(first.cover.name, second.cover.name)
+
+    def test_shared_cover_is_deleted_with_its_last_recipe(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        second = self.save_cover(self.recipes[1], make_upload())
+        run_pending_jobs()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        files = self.get_stored_files()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertEqual(self.get_stored_files(), files)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertEqual(self.get_stored_files(), [])
+        self.assertFalse(CoverFile.objects.exists())
+
+    def test_new_cover_is_deleted_with_its_recipe(self):
+        recipe = self.save_cover(self.recipes[0], make_upload())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+
+        self.assertEqual(self.get_stored_files(), [])
+
+    def test_recipes_using_a_cover_are_counted(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        self.save_cover(self.recipes[1], make_upload())
+        self.assertEqual(CoverFile.objects.get(name=first.cover.name).refs, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertEqual(CoverFile.objects.get(name=first.cover.name).refs, 1)
+
+    def test_cover_assigned_by_name_is_counted(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        self.save_cover(self.recipes[1], first.cover.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertTrue(os.path.exists(first.cover.path))
+        self.assertEqual(CoverFile.objects.get(name=first.cover.name).refs, 1)
+
+    def test_rolled_back_save_does_not_count_its_cover(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        second = Recipe.objects.get(pk=self.recipes[1].pk)
+        second.cover = make_upload()
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                second.save()
+                raise RuntimeError
+
+        self.assertEqual(CoverFile.objects.get(name=first.cover.name).refs, 1)
+
+    def test_reused_cover_is_touched(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        self.age_stored_files()
+        self.save_cover(self.recipes[1], make_upload())
+
+        self.assertGreater(
+            os.stat(first.cover.path).st_mtime,
+            time.time() - UPLOAD_GRACE_SECONDS
+        )
+
+    def test_cover_reused_by_an_uncommitted_upload_is_not_deleted(self):
+        first = self.save_cover(self.recipes[0], make_upload())
+        # Another upload of the same content, counted before its recipe is
+        # committed
+        first.cover.storage.save(CONTENT_ADDRESSED_DIR + 'b.jpg', make_upload())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertTrue(os.path.exists(first.cover.path))
+
+    def test_replaced_shared_cover_is_kept_for_the_other_recipe(self):
+        first = self.save_cover(self.recipes[0], make_upload(color='red'))
+        self.save_cover(self.recipes[1], make_upload(color='red'))
+        self.save_cover(self.recipes[0], make_upload(color='blue'))
+
+        self.assertTrue(os.path.exists(first.cover.path))
+
+    def test_reuploaded_cover_is_processed_again_after_it_was_deleted(self):
+        recipe = self.save_cover(self.recipes[0], make_upload())
+        run_pending_jobs()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+
+        recipe = self.save_cover(self.recipes[1], make_upload())
+        self.assertEqual(recipe.cover_status, Recipe.COVER_PENDING)
+        run_pending_jobs()
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.cover_status, Recipe.COVER_READY)
+        self.assertTrue(os.path.exists(
+            recipe.cover.storage.path(recipe.cover_variants['fallback']['name'])
+        ))
+
+    @override_settings(RECIPES_COVER_DEDUP=False)
+    def test_cover_is_stored_by_date_and_name_without_dedup(self):
+        first = self.save_cover(self.recipes[0], make_upload('cover.jpg'))
+        second = self.save_cover(self.recipes[1], make_upload('cover.jpg'))
+
+        self.assertTrue(first.cover.name.startswith('recipes/covers/20'))
+        self.assertTrue(first.cover.name.endswith('/cover.jpg'))
+        self.assertNotEqual(first.cover.name, second.cover.name)
@@ -1,4 +1,10 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
 from django.core.exceptions import ValidationError
+from django.test import override_settings
 from parameterized import parameterized
 
 from .test_recipe_base import RecipeTestBase
@@ -7,6 +13,12 @@ from recipes.models import Recipe
 
 class RecipeModelTest(RecipeTestBase):
     def setUp(self) -> None:
+        # Covers are written to a temporary MEDIA_ROOT
+        media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
         self.recipe = self.make_recipe()
         return super().setUp()
     
@@ -63,8 +75,7 @@ class RecipeModelTest(RecipeTestBase):
             msg=f'Recipe string representation must be "{needed}" but "{str(self.recipe)}" was received.'
         )
 
-    def test_recipe_save_calls_img_recize(self):
-        from unittest.mock import patch
+    def make_cover(self):
         from django.core.files.uploadedfile import SimpleUploadedFile
         from PIL import Image
         import io
@@ -74,20 +85,229 @@ class RecipeModelTest(RecipeTestBase):
         img_bytes = io.BytesIO()
         image.save(img_bytes, format='JPEG')
         img_bytes.seek(0)
-        django_image = SimpleUploadedFile(
+        return SimpleUploadedFile(
             name='test_cover.jpg',
             content=img_bytes.read(),
             content_type='image/jpeg'
         )
 
-        with patch('recipes.models.img_recize') as mock_img_recize:
-            self.recipe.cover = django_image
+    def test_recipe_save_queues_cover_processing(self):
+        from unittest.mock import patch
+        from jobs.models import Job
+
+        with patch('recipes.jobs.make_cover_variants') as mock_variants:
+            self.recipe.cover = self.make_cover()
             self.recipe.save()
-            # Check if img_recize was called
-            mock_img_recize.assert_called_once()
+            # The request that saved the recipe does not resize the cover
+            mock_variants.assert_not_called()
+
+        job = Job.objects.get(name='recipes.process_cover')
+        self.assertEqual(job.payload['cover'], self.recipe.cover.name)
+        self.assertEqual(self.recipe.cover_status, Recipe.COVER_PENDING)
+
+    def test_recipe_cover_job_makes_cover_variants(self):
+        from jobs.queue import run_pending_jobs
+
+        self.recipe.cover = self.make_cover()
+        self.recipe.save()
+        run_pending_jobs()
+
+        self.recipe.refresh_from_db()
+        variants = self.recipe.cover_variants
+        self.assertEqual(self.recipe.cover_status, Recipe.COVER_READY)
+        self.assertEqual(
+            [variant['width'] for variant in variants['webp']],
+            [320, 640, 840, 1200]
+        )
+        self.assertEqual(variants['fallback']['width'], 840)
+        self.assertTrue(variants['placeholder'].startswith('data:image/jpeg'))
+        self.assertIn('_320w.webp 320w', self.recipe.cover_srcset)
+
+        paths = [
+            self.recipe.cover.storage.path(variant['name'])
+            for variant in [*variants['webp'], variants['fallback']]
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        # Variants are deleted with the cover
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+    def test_recipe_cover_job_marks_covers_over_the_limits_as_failed(self):
+        from jobs.queue import run_pending_jobs
+
+        self.recipe.cover = self.make_cover()
+        self.recipe.save()
+
+        with override_settings(COVER_MAX_PIXELS=100):
+            run_pending_jobs()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.cover_status, Recipe.COVER_FAILED)
+        self.assertEqual(self.recipe.cover_variants, {})
+
+    @parameterized.expand(['decompression_bomb', 'truncated'])
+    def test_recipe_cover_job_marks_unreadable_covers_as_failed(self, kind):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from jobs.models import Job
+        from jobs.queue import run_pending_jobs
+        from recipes.tests.test_img_recize import forge_png_header
+
+        if kind == 'decompression_bomb':
+            content = forge_png_header(20000, 10000)
+        else:
+            content = self.make_cover().read()[:2000]
+
+        self.recipe.cover = SimpleUploadedFile(f'{kind}.png', content)
+        self.recipe.save()
+        run_pending_jobs()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.cover_status, Recipe.COVER_FAILED)
+        # Failed once for good, not retried
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_recipe_cover_job_retries_errors_writing_the_variants(self):
+        import errno
+        from unittest.mock import patch
+        from jobs.models import Job
+        from jobs.queue import run_pending_jobs
+
+        self.recipe.cover = self.make_cover()
+        self.recipe.save()
+
+        with patch(
+            'utils.img_recize._save_variant',
+            side_effect=OSError(errno.ENOSPC, 'No space left on device'),
+        ):
+            run_pending_jobs()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.cover_status, Recipe.COVER_PENDING)
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertIn('No space left on device', job.last_error)
+
+    def test_recipe_save_without_a_new_cover_does_not_queue_a_job(self):
+        from jobs.models import Job
+
+        self.recipe.cover = self.make_cover()
+        self.recipe.save()
+        self.recipe.title = 'Another title'
+        self.recipe.save()
+
+        self.assertEqual(Job.objects.count(), 1)
 
     def test_recipe_slug_generate_dont_exist(self):
         self.recipe.title = 'Test for slug in recipe'
         self.recipe.slug = ''
         self.recipe.save()
         self.assertNotEqual('test-for-slug-in-recipe', self.recipe.slug)
+
+    def test_recipe_save_stores_the_normalized_title(self):
+        self.recipe.title = '  Pão   de QUEIJO '
+        self.recipe.save(update_fields=['title'])
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title_normalized, 'pao de queijo')
+
+    def test_recipe_clean_finds_titles_that_only_differ_by_case_and_accents(self):
+        self.recipe.title = 'Pão de Queijo'
+        self.recipe.save()
+        recipe = Recipe(title='PAO  de queijo')
+
+        with self.assertRaises(ValidationError) as error:
+            recipe.clean()
+
+        self.assertIn('title', error.exception.message_dict)
+
+    def test_recipe_clean_ignores_the_recipe_itself(self):
+        self.recipe.clean()
+
+    def test_recipe_clean_uses_the_normalized_title_index(self):
+        plan = Recipe.objects.filter(
+            title_normalized='recipe title'
+        ).exclude(pk=1).explain()
+        self.assertIn('title_normalized', plan)
+
+
+class RecipeDirtyFieldsTest(RecipeTestBase):
+    def setUp(self) -> None:
+        self.make_recipe()
+        self.recipe = Recipe.objects.get()
+        return super().setUp()
+
+    def get_recipe_selects(self, queries):
+        return [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "recipes_recipe" WHERE "recipes_recipe"."id"' in query['sql']
+        ]
+
+    def test_recipe_loaded_from_the_database_has_no_changed_fields(self):
+        self.assertEqual(self.recipe.changed_fields, set())
+
+    def test_recipe_changed_fields_lists_modified_fields_until_saved(self):
+        self.recipe.title = 'Another title'
+        self.recipe.category = self.make_category(name='Another')
+        self.assertEqual(self.recipe.changed_fields, {'title', 'category_id'})
+
+        self.recipe.save(update_fields=['title', 'category'])
+        self.assertEqual(self.recipe.changed_fields, set())
+        self.assertEqual(self.recipe.get_loaded_value('title'), 'Another title')
+
+    def test_recipe_save_and_delete_do_not_read_the_row_again(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.recipe.title = 'Another title'
+
+        with CaptureQueriesContext(connection) as queries:
+            self.recipe.save()
+            self.recipe.delete()
+
+        self.assertEqual(self.get_recipe_selects(queries), [])
+
+    def test_recipe_save_without_changes_skips_the_search_index(self):
+        from unittest.mock import patch
+
+        with patch('recipes.signals.index_recipe') as mock_index_recipe:
+            self.recipe.save()
+
+        mock_index_recipe.assert_not_called()
+
+    def test_recipe_save_without_changes_invalidates_nothing(self):
+        from unittest.mock import patch
+        from django.db.models.signals import post_save
+
+        changed_fields = []
+
+        def record(sender, instance, **kwargs):
+            changed_fields.append(instance.changed_fields)
+
+        post_save.connect(record, sender=Recipe)
+        self.addCleanup(post_save.disconnect, record, sender=Recipe)
+
+        with patch('recipes.signals.invalidate_cache_groups') as mock_pages, \
+                patch('recipes.signals.adjust_published_counts') as mock_counts:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.recipe.save()
+
+        self.assertEqual(changed_fields, [set()])
+        mock_pages.assert_not_called()
+        mock_counts.assert_not_called()
+
+    def test_recipe_built_with_an_existing_pk_reads_the_row_once(self):
+        recipe = Recipe(
+            pk=self.recipe.pk,
+            title='Built by hand',
+            slug=self.recipe.slug,
+            preparation_time=1,
+            servings=1,
+            is_published=False,
+            created_at=self.recipe.created_at,
+        )
+        self.assertNotIn('_loaded_values', recipe.__dict__)
+
+        recipe.save()
+
+        self.assertEqual(recipe.changed_fields, set())
+        self.assertEqual(recipe.get_loaded_value('is_published'), False)
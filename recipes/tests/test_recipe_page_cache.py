@@ -0,0 +1,150 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+@override_settings(RECIPES_PAGE_CACHE=True)
+class RecipePageCacheTest(RecipeTestBase):
+    def setUp(self) -> None:
+        cache.clear()
+        return super().setUp()
+
+    def make_cached_recipe(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.make_recipe(**kwargs)
+
+    def test_recipe_home_is_served_from_cache_on_second_request(self):
+        self.make_cached_recipe()
+        first = self.client.get(reverse('recipes:home'))
+
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('recipes:home'))
+
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(first.content, second.content)
+
+    def test_recipe_page_cache_key_includes_query_string(self):
+        self.make_cached_recipe()
+        self.client.get(reverse('recipes:home'))
+        response = self.client.get(reverse('recipes:home') + '?page=1')
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    @override_settings(RECIPES_PAGE_CACHE=False)
+    def test_recipe_page_cache_is_opt_in(self):
+        self.client.get(reverse('recipes:home'))
+        response = self.client.get(reverse('recipes:home'))
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_recipe_page_cache_is_skipped_for_logged_users(self):
+        self.make_author(username='logged', password='logged')
+        self.client.login(username='logged', password='logged')
+        self.client.get(reverse('recipes:home'))
+        response = self.client.get(reverse('recipes:home'))
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_recipe_save_purges_only_the_pages_it_appears_on(self):
+        recipe = self.make_cached_recipe()
+        other = self.make_cached_recipe(
+            slug='other',
+            title='Other recipe',
+            category_data={'name': 'Other'},
+            author_data={'username': 'other'},
+        )
+        urls = {
+            'home': reverse('recipes:home'),
+            'detail': reverse('recipes:recipe', args=(recipe.id,)),
+            'category': reverse('recipes:category', args=(recipe.category.id,)),
+            'other_detail': reverse('recipes:recipe', args=(other.id,)),
+            'other_category': reverse(
+                'recipes:category', args=(other.category.id,)
+            ),
+        }
+
+        for url in urls.values():
+            self.client.get(url)
+
+        recipe.title = 'Changed title'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save()
+
+        responses = {
+            name: self.client.get(url) for name, url in urls.items()
+        }
+
+        self.assertEqual(responses['home']['X-Page-Cache'], 'miss')
+        self.assertEqual(responses['detail']['X-Page-Cache'], 'miss')
+        self.assertEqual(responses['category']['X-Page-Cache'], 'miss')
+        self.assertEqual(responses['other_detail']['X-Page-Cache'], 'hit')
+        self.assertEqual(responses['other_category']['X-Page-Cache'], 'hit')
+        self.assertIn('Changed title', responses['detail'].content.decode())
+
+    def test_recipe_tags_change_purges_the_tag_page(self):
+        recipe = self.make_cached_recipe()
+        tag = Tag.objects.create(name='Doces', slug='doces')
+        tag_url = reverse('recipes:tag', args=(tag.slug,))
+        self.client.get(tag_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.tags.add(tag)
+
+        response = self.client.get(tag_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertIn(recipe.title, response.content.decode())
+
+    def test_category_rename_purges_the_pages_showing_its_name(self):
+        recipe = self.make_cached_recipe()
+        urls = [
+            reverse('recipes:home'),
+            reverse('recipes:recipe', args=(recipe.id,)),
+        ]
+
+        for url in urls:
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.category.name = 'Renamed category'
+            recipe.category.save()
+
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response['X-Page-Cache'], 'miss')
+            self.assertIn('Renamed category', response.content.decode())
+
+    def test_tag_rename_purges_the_detail_pages_of_its_recipes(self):
+        recipe = self.make_cached_recipe()
+        tag = Tag.objects.create(name='Doces', slug='doces')
+        recipe.tags.add(tag)
+        detail_url = reverse('recipes:recipe', args=(recipe.id,))
+        self.client.get(detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.name = 'Sobremesas'
+            tag.save()
+
+        response = self.client.get(detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertIn('Sobremesas', response.content.decode())
+
+    def test_recipe_delete_purges_its_detail_page(self):
+        recipe = self.make_cached_recipe()
+        detail_url = reverse('recipes:recipe', args=(recipe.id,))
+        self.client.get(detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+
+        self.assertEqual(self.client.get(detail_url).status_code, 404)
+
+    def test_recipe_api_v2_list_is_cached_for_anonymous_users(self):
+        self.make_cached_recipe()
+        api_url = reverse('recipes:recipes-api-list')
+        self.client.get(api_url)
+        response = self.client.get(api_url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(len(response.json()['results']), 1)
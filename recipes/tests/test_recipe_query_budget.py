@@ -0,0 +1,117 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from tag.models import Tag
+from utils.query_budget import (
+    QueryBudgetMiddleware,
+    QueryBudgetTestMixin,
+    normalize_sql,
+    record_queries,
+)
+
+from recipes.catalog import get_catalog
+from recipes.models import Recipe
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeQueryBudgetTest(RecipeTestBase, QueryBudgetTestMixin):
+    def setUp(self):
+        self.recipes = self.make_recipe_in_bath(qtd=8)
+        self.tag = Tag.objects.create(name='Sweet', slug='sweet')
+
+        for recipe in self.recipes:
+            recipe.tags.add(self.tag)
+
+        # Budgets are for a warm process, the catalog is loaded once
+        get_catalog()
+        return super().setUp()
+
+    def assert_url_within_budget(self, url_name, *args, **params):
+        with self.assertQueryBudget(url_name), self.assertNoRepeatedQueries():
+            response = self.client.get(
+                reverse(url_name, args=args), data=params
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_recipe_list_pages_are_within_query_budget(self):
+        recipe = self.recipes[0]
+
+        self.assert_url_within_budget('recipes:home')
+        self.assert_url_within_budget('recipes:category', recipe.category_id)
+        self.assert_url_within_budget('recipes:tag', self.tag.slug)
+        self.assert_url_within_budget('recipes:search', q='Recipe')
+        self.assert_url_within_budget('recipes:api_v1')
+        self.assert_url_within_budget('recipes:recipes-api-list')
+
+    def test_recipe_detail_pages_are_within_query_budget(self):
+        recipe = self.recipes[0]
+
+        self.assert_url_within_budget('recipes:recipe', recipe.id)
+        self.assert_url_within_budget('recipes:api_v1_detail', recipe.id)
+        self.assert_url_within_budget('recipes:recipes-api-detail', recipe.id)
+
+    def test_assert_no_repeated_queries_fails_on_n_plus_one(self):
+        with self.assertRaises(AssertionError) as error:
+            with self.assertNoRepeatedQueries():
+                for recipe in Recipe.objects.all():
+                    recipe.author.username
+
+        self.assertIn('8x at recipes/tests/test_recipe_query_budget.py', str(error.exception))
+
+    def test_assert_query_budget_fails_when_exceeded(self):
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget('recipes:home', budget=1):
+                list(Recipe.objects.all())
+                list(Tag.objects.all())
+
+    def test_normalize_sql_groups_queries_by_shape(self):
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            normalize_sql('SELECT * FROM t WHERE id IN (%s) LIMIT 1'),
+        )
+
+    def test_record_queries_groups_by_call_site(self):
+        with record_queries() as recorder:
+            for recipe in self.recipes[:3]:
+                Recipe.objects.get(pk=recipe.pk)
+
+        [(_, call_site, count)] = recorder.get_repeated(threshold=2)
+        self.assertEqual(count, 3)
+        self.assertTrue(call_site.startswith('recipes/tests/'))
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True)
+class RecipeQueryBudgetMiddlewareTest(RecipeTestBase):
+    def test_query_budget_headers_are_sent_when_enabled(self):
+        self.make_recipe()
+        response = self.client.get(reverse('recipes:home'))
+
+        self.assertIn('X-Query-Count', response.headers)
+        self.assertEqual(response.headers['X-Query-Budget'], '3')
+        self.assertNotIn('X-Query-Repeated', response.headers)
+
+    def get_repeated_queries_response(self, recipes):
+        def get_response(request):
+            for recipe in recipes:
+                Recipe.objects.get(pk=recipe.pk)
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(get_response)
+
+        with self.assertLogs('utils.query_budget', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/'))
+
+        self.assertIn('recipes/tests/', logs.output[0])
+        return response
+
+    def test_repeated_query_call_sites_are_only_sent_in_debug(self):
+        recipes = self.make_recipe_in_bath(qtd=3)
+        response = self.get_repeated_queries_response(recipes)
+        self.assertNotIn('X-Query-Repeated', response.headers)
+
+        with override_settings(DEBUG=True):
+            response = self.get_repeated_queries_response(recipes)
+
+        self.assertIn('recipes/tests/', response.headers['X-Query-Repeated'])
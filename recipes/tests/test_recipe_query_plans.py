@@ -0,0 +1,57 @@
+import re
+from unittest import skipUnless
+
+from django.db import connection
+
+from recipes.models import Recipe
+
+from .test_recipe_base import RecipeTestBase
+
+FULL_SCAN_RE = re.compile(r'\bSCAN (\w+)\b(?! USING)')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite only')
+class RecipeQueryPlanTest(RecipeTestBase):
+    def setUp(self):
+        self.recipe = self.make_recipe()
+        self.published = Recipe.objects.filter(
+            is_published=True
+        ).select_related(
+            'author', 'author__profile', 'category'
+        ).order_by('-id')
+        return super().setUp()
+
+    def assertNoFullScan(self, queryset):
+        plan = queryset.explain()
+        full_scans = FULL_SCAN_RE.findall(plan)
+        self.assertEqual(full_scans, [], f'Full scan in:\n{plan}')
+
+    def test_home_query_uses_an_index(self):
+        self.assertNoFullScan(self.published[:6])
+
+    def test_home_keyset_query_uses_an_index(self):
+        self.assertNoFullScan(self.published.filter(id__lt=self.recipe.id)[:7])
+
+    def test_published_count_uses_an_index(self):
+        self.assertNoFullScan(Recipe.objects.filter(is_published=True))
+
+    def test_category_query_uses_an_index(self):
+        self.assertNoFullScan(
+            self.published.filter(category_id=self.recipe.category_id)[:6]
+        )
+
+    def test_tag_query_uses_an_index(self):
+        self.assertNoFullScan(self.published.filter(tags__id=1)[:6])
+
+    def test_author_query_uses_an_index(self):
+        self.assertNoFullScan(
+            self.published.filter(author_id=self.recipe.author_id)[:6]
+        )
+
+    def test_dashboard_query_uses_an_index(self):
+        self.assertNoFullScan(
+            Recipe.objects.filter(
+                is_published=False,
+                author_id=self.recipe.author_id,
+            ).order_by('-id')
+        )
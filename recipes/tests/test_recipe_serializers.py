@@ -0,0 +1,161 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import test
+from rest_framework.renderers import JSONRenderer
+
+from recipes.models import Recipe
+from recipes.serializers import RecipeReadSerializer, RecipeSerializer
+from recipes.tests.test_recipe_base import RecipeMixing
+from tag.models import Tag
+
+
+class RecipeReadSerializerTest(test.APITestCase, RecipeMixing):
+    def setUp(self):
+        recipes = self.make_recipe_in_bath(qtd=4)
+        tags = [
+            Tag.objects.create(name=name, slug=f'tag-{index}')
+            for index, name in enumerate(['Doce', 'Pão de queijo', '"Quoted"'])
+        ]
+        recipes[0].tags.add(tags[2], tags[0])
+        recipes[1].tags.add(tags[1])
+        Recipe.objects.filter(pk=recipes[1].pk).update(
+            title='Açaí & <b>bowl</b>', cover='recipes/covers/açaí bowl.jpg'
+        )
+        Recipe.objects.filter(pk=recipes[2].pk).update(
+            category=None, author=None
+        )
+        return super().setUp()
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def get_request(self):
+        return self.client.get('/').wsgi_request
+
+    def test_output_is_the_same_as_recipe_serializer(self):
+        request = self.get_request()
+        queryset = Recipe.objects.get_published()
+        expected = RecipeSerializer(
+            queryset, many=True, context={'request': request}
+        ).data
+        data = RecipeReadSerializer(
+            RecipeReadSerializer.project(queryset), request
+        ).data
+
+        self.assertEqual(len(data), 4)
+        self.assertEqual(self.render(data), self.render(expected))
+
+    def test_recipe_without_rows_renders_an_empty_list(self):
+        data = RecipeReadSerializer(
+            RecipeReadSerializer.project(Recipe.objects.none()),
+            self.get_request()
+        ).data
+        self.assertEqual(data, [])
+
+    def test_tags_are_loaded_with_one_query(self):
+        request = self.get_request()
+        rows = list(RecipeReadSerializer.project(Recipe.objects.get_published()))
+
+        with self.assertNumQueries(1):
+            RecipeReadSerializer(rows, request).data
+
+    def test_list_endpoint_is_the_same_as_recipe_serializer(self):
+        response = self.client.get(reverse('recipes:recipes-api-list'))
+        expected = RecipeSerializer(
+            Recipe.objects.get_published()[:5],
+            many=True,
+            context={'request': response.wsgi_request},
+        ).data
+
+        self.assertEqual(
+            response.content,
+            self.render({
+                'count': 4, 'next': None, 'previous': None, 'results': expected
+            })
+        )
+
+    def test_retrieve_endpoint_is_the_same_as_recipe_serializer(self):
+        recipe = Recipe.objects.get_published().first()
+        response = self.client.get(
+            reverse('recipes:recipes-api-detail', args=(recipe.pk,))
+        )
+        expected = RecipeSerializer(
+            recipe, context={'request': response.wsgi_request}
+        ).data
+
+        self.assertEqual(response.content, self.render(expected))
+
+    def test_retrieve_endpoint_returns_404_for_unpublished_recipes(self):
+        recipe = self.make_recipe(
+            author_data={'username': 'draft'}, slug='draft', is_published=False
+        )
+        response = self.client.get(
+            reverse('recipes:recipes-api-detail', args=(recipe.pk,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class RecipeAPIv2SparseFieldsTest(test.APITestCase, RecipeMixing):
+    def setUp(self):
+        self.recipe = self.make_recipe()
+        self.recipe.tags.add(Tag.objects.create(name='Doce', slug='doce'))
+        return super().setUp()
+
+    def get_list(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('recipes:recipes-api-list'), data=params
+            )
+        return response, [query['sql'] for query in queries]
+
+    def test_fields_keeps_only_the_requested_fields_in_order(self):
+        full, _ = self.get_list()
+        response, _ = self.get_list(fields='title,id')
+
+        self.assertEqual(list(response.data['results'][0]), ['id', 'title'])
+        self.assertEqual(
+            response.data['results'][0]['title'],
+            full.data['results'][0]['title']
+        )
+
+    def test_omit_drops_the_listed_fields(self):
+        response, _ = self.get_list(omit='preparation_steps, tag_links')
+        result = response.data['results'][0]
+
+        self.assertNotIn('preparation_steps', result)
+        self.assertNotIn('tag_links', result)
+        self.assertEqual(result['tags'], list(self.recipe.tags.values_list(
+            'id', flat=True
+        )))
+
+    def test_unknown_fields_return_400(self):
+        response, _ = self.get_list(fields='title,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.data['fields'][0])
+
+    def test_unrequested_columns_and_tags_are_not_loaded(self):
+        _, queries = self.get_list(fields='id,title,preparation')
+        recipe_query = next(
+            query for query in queries if 'LIMIT' in query
+        )
+
+        self.assertIn('"preparation_time_unit"', recipe_query)
+        self.assertNotIn('"preparation_steps"', recipe_query)
+        self.assertNotIn('author_full_name', recipe_query)
+        self.assertFalse(any('recipes_recipe_tags' in query for query in queries))
+
+    def test_tag_fields_load_the_tags(self):
+        response, queries = self.get_list(fields='tag_objects')
+
+        self.assertEqual(
+            response.data['results'][0]['tag_objects'][0]['slug'], 'doce'
+        )
+        self.assertTrue(any('recipes_recipe_tags' in query for query in queries))
+
+    def test_retrieve_supports_fields(self):
+        response = self.client.get(
+            reverse('recipes:recipes-api-detail', args=(self.recipe.pk,)),
+            data={'fields': 'id,cover', 'omit': 'cover'},
+        )
+        self.assertEqual(response.data, {'id': self.recipe.pk})
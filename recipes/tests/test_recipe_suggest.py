@@ -0,0 +1,109 @@
+from django.urls import reverse
+
+from recipes.cache import get_group_version, invalidate_cache_groups
+from recipes.models import Recipe
+from recipes.suggest import (
+    SUGGEST_GROUP, PrefixIndex, load_suggestions, suggestion_index,
+)
+from tag.models import Tag
+
+from .test_recipe_base import RecipeTestBase
+
+
+class RecipeSuggestTest(RecipeTestBase):
+    def setUp(self) -> None:
+        suggestion_index.clear()
+        return super().setUp()
+
+    def get_suggestions(self, query):
+        response = self.client.get(reverse('recipes:suggest'), {'q': query})
+        return [result['label'] for result in response.json()['results']]
+
+    def test_recipe_suggest_url_is_correct(self):
+        self.assertEqual(reverse('recipes:suggest'), '/recipes/suggest/')
+
+    def test_recipe_suggest_returns_titles_and_tags_by_prefix(self):
+        self.make_recipe(title='Bolo de cenoura')
+        Tag.objects.create(name='Bolos', slug='bolos')
+        Tag.objects.create(name='Sopas', slug='sopas')
+
+        self.assertEqual(
+            ['Bolo de cenoura', 'Bolos'],
+            self.get_suggestions('bol')
+        )
+
+    def test_recipe_suggest_ignores_case_and_accents(self):
+        self.make_recipe(title='Pão de queijo')
+        self.assertEqual(['Pão de queijo'], self.get_suggestions('PAO'))
+
+    def test_recipe_suggest_does_not_show_not_published_recipes(self):
+        self.make_recipe(title='Bolo de cenoura', is_published=False)
+        self.assertEqual([], self.get_suggestions('bolo'))
+
+    def test_recipe_suggest_index_is_updated_without_queries(self):
+        recipe = self.make_recipe(title='Bolo de cenoura')
+        self.get_suggestions('bolo')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.title = 'Torta de limão'
+            recipe.save()
+
+        # The version moved, the worker that wrote adopted it
+        with self.assertNumQueries(0):
+            self.assertEqual([], self.get_suggestions('bolo'))
+            self.assertEqual(['Torta de limão'], self.get_suggestions('torta'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual([], self.get_suggestions('torta'))
+
+    def test_recipe_suggest_rolled_back_changes_are_not_applied(self):
+        recipe = self.make_recipe(title='Bolo de cenoura')
+        self.get_suggestions('bolo')
+
+        with self.captureOnCommitCallbacks(execute=False):
+            recipe.title = 'Torta de limão'
+            recipe.save()
+
+        self.assertEqual(['Bolo de cenoura'], self.get_suggestions('bolo'))
+
+    def test_recipe_suggest_other_workers_replay_the_changes(self):
+        recipe = self.make_recipe(title='Bolo de cenoura')
+        other_worker = PrefixIndex(load_suggestions, SUGGEST_GROUP)
+        other_worker.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.title = 'Torta de limão'
+            recipe.save()
+            Tag.objects.create(name='Tortas', slug='tortas')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ['Torta de limão', 'Tortas'],
+                [label for _, _, label, _ in other_worker.search('torta')]
+            )
+
+    def test_recipe_suggest_reloads_when_the_changes_are_gone(self):
+        recipe = self.make_recipe(title='Bolo de cenoura')
+        self.get_suggestions('bolo')
+        # Changed without a logged change, an expired log is the same
+        Recipe.objects.filter(pk=recipe.pk).update(
+            title='Torta de limão'
+        )
+        invalidate_cache_groups([SUGGEST_GROUP])
+
+        self.assertEqual(['Torta de limão'], self.get_suggestions('torta'))
+
+    def test_recipe_suggest_changes_move_the_shared_version(self):
+        version = get_group_version(SUGGEST_GROUP)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_recipe(title='Bolo de cenoura')
+
+        self.assertNotEqual(version, get_group_version(SUGGEST_GROUP))
+
+    def test_recipe_suggest_empty_query_returns_no_results(self):
+        self.make_recipe(title='Bolo de cenoura')
+        self.assertEqual([], self.get_suggestions(''))
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.urls import reverse, resolve
 from recipes import views
 
@@ -43,3 +45,15 @@ class RecipeCategoryViewTest(RecipeTestBase):
             )
         )
         self.assertEqual(response.status_code, 404)
+
+    def test_recipe_category_is_found_with_a_stale_zero_count(self):
+        recipe = self.make_recipe(title='Counted before it was published')
+
+        with patch('recipes.views.site.get_published_count', return_value=0):
+            response = self.client.get(reverse(
+                'recipes:category',
+                kwargs={'category_id': recipe.category.id}
+            ))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['recipes'].paginator.count, 1)
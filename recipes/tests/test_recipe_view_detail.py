@@ -1,5 +1,9 @@
+from django.test import RequestFactory
 from django.urls import reverse, resolve
 from recipes import views
+from recipes.loaders import get_recipe_loader
+from recipes.models import Category, Recipe
+from tag.models import Tag
 
 from .test_recipe_base import RecipeTestBase
 
@@ -33,3 +37,71 @@ class RecipeDetailViewTest(RecipeTestBase):
             )
         )
         self.assertEqual(response.status_code, 404)
+
+    def test_recipe_detail_loads_recipe_with_one_query_and_tag_prefetch(self):
+        recipe = self.make_recipe()
+        recipe.tags.add(Tag.objects.create(name='Sweet', slug='sweet'))
+
+        # Freshness check, the recipe with its relations and the tags
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('recipes:recipe', args=(recipe.id,))
+            )
+
+        self.assertContains(response, 'Sweet')
+
+    def test_recipe_detail_api_loads_recipe_once(self):
+        recipe = self.make_recipe()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('recipes:api_v1_detail', args=(recipe.id,))
+            )
+
+        self.assertEqual(response.json()['title'], recipe.title)
+
+    def test_recipe_detail_renders_cover_srcset_from_the_variants(self):
+        recipe = self.make_recipe()
+        Recipe.objects.filter(pk=recipe.pk).update(
+            cover='recipes/covers/cover.jpg',
+            cover_variants={
+                'webp': [
+                    {'name': 'recipes/covers/cover_320w.webp', 'width': 320, 'height': 160},
+                    {'name': 'recipes/covers/cover_640w.webp', 'width': 640, 'height': 320},
+                ],
+                'fallback': {'name': 'recipes/covers/cover_640w.jpg', 'width': 640, 'height': 320},
+                'placeholder': 'data:image/jpeg;base64,AAAA',
+            },
+        )
+        response = self.client.get(reverse('recipes:recipe', args=(recipe.id,)))
+
+        self.assertContains(
+            response,
+            'srcset="/media/recipes/covers/cover_320w.webp 320w, '
+            '/media/recipes/covers/cover_640w.webp 640w"'
+        )
+        self.assertContains(response, 'src="/media/recipes/covers/cover_640w.jpg"')
+        self.assertContains(response, 'data:image/jpeg;base64,AAAA')
+
+
+class RecipeLoaderTest(RecipeTestBase):
+    def test_recipe_loader_returns_the_same_instance_for_a_request(self):
+        recipe = self.make_recipe()
+        loader = get_recipe_loader(RequestFactory().get('/'))
+
+        first = loader.get_published_recipe(recipe.id)
+
+        with self.assertNumQueries(0):
+            second = loader.get_published_recipe(str(recipe.id))
+
+        self.assertIs(first, second)
+        self.assertIs(loader.identity_map.get(Category, recipe.category_id), first.category)
+
+    def test_recipe_loader_remembers_missing_recipes(self):
+        recipe = self.make_recipe(is_published=False)
+        loader = get_recipe_loader(RequestFactory().get('/'))
+
+        self.assertIsNone(loader.get_published_recipe(recipe.id))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(loader.get_published_recipe(recipe.id))
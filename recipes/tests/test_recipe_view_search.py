@@ -53,4 +53,62 @@ class RecipeSearchViewTest(RecipeTestBase):
         self.assertNotIn(recipe1, response2.context['recipes'])
 
         self.assertIn(recipe1, response_both.context['recipes'])
-        self.assertIn(recipe2, response_both.context['recipes'])
\ No newline at end of file
+        self.assertIn(recipe2, response_both.context['recipes'])
+
+    def test_recipe_search_ranks_title_matches_first(self):
+        in_description = self.make_recipe(
+            slug='in-description',
+            title='Simple dessert',
+            description='Made with chocolate',
+            author_data={'username': 'one'},
+        )
+        in_title = self.make_recipe(
+            slug='in-title',
+            title='Chocolate cake',
+            description='Simple dessert',
+            author_data={'username': 'two'},
+        )
+
+        response = self.client.get(reverse('recipes:search') + '?q=chocolate')
+
+        self.assertEqual(
+            [in_title, in_description],
+            list(response.context['recipes'])
+        )
+
+    def test_recipe_search_matches_prefixes_of_every_word(self):
+        recipe = self.make_recipe(
+            slug='cake',
+            title='Chocolate cake',
+            author_data={'username': 'one'},
+        )
+        self.make_recipe(
+            slug='pie',
+            title='Chocolate pie',
+            author_data={'username': 'two'},
+        )
+
+        response = self.client.get(reverse('recipes:search') + '?q=choc ca')
+
+        self.assertEqual([recipe], list(response.context['recipes']))
+
+    def test_recipe_search_ignores_accents(self):
+        recipe = self.make_recipe(title='Feijão tropeiro')
+        response = self.client.get(reverse('recipes:search') + '?q=feijao')
+        self.assertIn(recipe, response.context['recipes'])
+
+    def test_recipe_search_index_follows_recipe_changes(self):
+        recipe = self.make_recipe(title='Old recipe title')
+        recipe.title = 'Brand new title'
+        recipe.save()
+        search_url = reverse('recipes:search')
+
+        response = self.client.get(f'{search_url}?q=old')
+        self.assertNotIn(recipe, response.context['recipes'])
+
+        response = self.client.get(f'{search_url}?q=brand')
+        self.assertIn(recipe, response.context['recipes'])
+
+        recipe.delete()
+        response = self.client.get(f'{search_url}?q=brand')
+        self.assertEqual(len(response.context['recipes']), 0)
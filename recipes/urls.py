@@ -27,6 +27,11 @@ urlpatterns = [
         views.RecipeListViewSearch.as_view(),
         name='search'
     ),
+    path(
+        'recipes/suggest/',
+        views.suggest,
+        name='suggest'
+    ),
     path(
         'recipes/tags/<slug:slug>/',
         views.RecipeListViewTag.as_view(),
@@ -1,30 +1,171 @@
+import os
+from functools import partial
+
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from rest_framework.decorators import api_view
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework import status
 
+from recipes.bulk import (
+    DUPLICATE_TITLE_ERROR,
+    bulk_create_recipes,
+    get_existing_tag_ids,
+    get_taken_titles,
+)
+from recipes.cache import CachedResponseMixin
+from recipes.conditional import (
+    recipe_etag,
+    recipe_last_modified,
+    recipe_list_etag,
+)
+from recipes.counts import get_published_count
 from recipes.models import Recipe
 from tag.models import Tag
-from ..serializers import RecipeSerializer, TagSerializer
+from ..serializers import (
+    RecipeBulkItemSerializer,
+    RecipeReadSerializer,
+    RecipeSerializer,
+    TagSerializer,
+)
 from ..permissions import IsOwner
+from utils.pagination import CountedPaginator
+from utils.strings import fold_text
+
+# page = numbered pages - cursor = ?cursor= links ordered by -id
+API_PAGINATION_MODE = os.environ.get('API_PAGINATION_MODE', 'page')
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 50))
+# Recipes accepted by one POST /recipes/api/v2/bulk/
+API_BULK_MAX_RECIPES = int(os.environ.get('API_BULK_MAX_RECIPES', 100))
+# Ids accepted by one GET /recipes/api/v2/batch/
+API_BATCH_MAX_IDS = int(os.environ.get('API_BATCH_MAX_IDS', 100))
 
 
 class RecipeAPIv2Pagination(PageNumberPagination):
     page_size = 5
 
+    def paginate_queryset(self, queryset, request, view=None):
+        count = None
+
+        if view is not None and hasattr(view, 'get_result_count'):
+            count = view.get_result_count()
+
+        self.django_paginator_class = partial(CountedPaginator, count=count)
+        return super().paginate_queryset(queryset, request, view)
+
+
+class RecipeAPIv2CursorPagination(CursorPagination):
+    # Seeks on the id instead of OFFSET and COUNT(*), so deep pages cost the
+    # same and recipes published while scrolling do not shift the pages
+    ordering = '-id'
+    page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = API_MAX_PAGE_SIZE
+
 
-class RecipeAPIv2ViewSet(ModelViewSet):
+@method_decorator(condition(etag_func=recipe_list_etag), name='list')
+@method_decorator(
+    condition(
+        etag_func=recipe_etag,
+        last_modified_func=recipe_last_modified,
+    ),
+    name='retrieve'
+)
+class RecipeAPIv2ViewSet(CachedResponseMixin, ModelViewSet):
     queryset = Recipe.objects.get_published()
     serializer_class = RecipeSerializer
     pagination_class = RecipeAPIv2Pagination
     permission_classes = [IsAuthenticatedOrReadOnly, ]
     http_method_names = ['get', 'options', 'head', 'patch', 'post', 'delete']
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            self._paginator = (
+                RecipeAPIv2CursorPagination()
+                if self.uses_cursor_pagination()
+                else self.pagination_class()
+            )
+        return self._paginator
+
+    def uses_cursor_pagination(self):
+        params = self.request.query_params
+        mode = params.get('pagination', API_PAGINATION_MODE)
+        return mode == 'cursor' or 'cursor' in params
+
+    def get_cache_group(self):
+        action = self.action_map.get(self.request.method.lower())
+
+        if action == 'retrieve':
+            return f'recipe:{self.kwargs.get("pk")}'
+
+        if action == 'list':
+            category_id = self.request.GET.get('category_id', '')
+
+            if category_id != '' and category_id.isnumeric():
+                return f'category:{category_id}'
+
+            return 'home'
+
+        return None
+
+    def get_result_count(self):
+        category_id = self.request.query_params.get('category_id', '')
+
+        if category_id != '' and category_id.isnumeric():
+            return get_published_count(f'category:{category_id}')
+
+        return get_published_count('home')
     
+    def get_list_param(self, param):
+        # Comma-separated values, in order and without repeats
+        return list(dict.fromkeys(
+            value.strip()
+            for value in self.request.query_params.get(param, '').split(',')
+            if value.strip()
+        ))
+
+    def get_fields(self):
+        # ?fields= keeps only the listed fields, ?omit= drops them
+        requested = set(self.get_list_param('fields'))
+        omitted = set(self.get_list_param('omit'))
+        unknown = (requested | omitted).difference(RecipeReadSerializer.fields)
+
+        if unknown:
+            raise ValidationError({
+                'fields': [f'Unknown fields: {", ".join(sorted(unknown))}']
+            })
+
+        return [
+            field for field in RecipeReadSerializer.fields
+            if (not requested or field in requested) and field not in omitted
+        ]
+
+    def get_expand(self):
+        expand = self.get_list_param('expand')
+        unknown = set(expand).difference(RecipeReadSerializer.expandable)
+
+        if unknown:
+            raise ValidationError({
+                'expand': [f'Unknown fields: {", ".join(sorted(unknown))}']
+            })
+
+        return expand
+
     def get_queryset(self):
-        qs = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'batch'):
+            # RecipeReadSerializer loads the columns and tags it renders
+            qs = Recipe.objects.get_published(
+                author_full_name=False, tags=False
+            )
+        else:
+            qs = super().get_queryset()
 
         category_id = self.request.query_params.get('category_id', '')
 
@@ -33,6 +174,30 @@ class RecipeAPIv2ViewSet(ModelViewSet):
 
         return qs
     
+    def list(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        page = self.paginate_queryset(
+            RecipeReadSerializer.project(self.get_queryset(), fields)
+        )
+        return self.get_paginated_response(
+            RecipeReadSerializer(page, request, fields).data
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # Read permissions do not depend on the recipe, only PATCH and
+        # DELETE load it through get_object()
+        fields = self.get_fields()
+        rows = RecipeReadSerializer.project(
+            self.get_queryset().filter(pk=self.kwargs.get('pk', '')), fields
+        )
+        data = RecipeReadSerializer(rows, request, fields).data
+
+        if not data:
+            # Same message as get_object_or_404
+            raise Http404('No Recipe matches the given query.')
+
+        return Response(data[0])
+
     def get_object(self):
         pk = self.kwargs.get('pk', '')
         obj = get_object_or_404(
@@ -58,6 +223,121 @@ class RecipeAPIv2ViewSet(ModelViewSet):
             headers=headers
         )
 
+    @action(detail=False, methods=['get'], url_path='batch', url_name='batch')
+    def batch(self, request, *args, **kwargs):
+        # ?ids=3,1,2 in one round trip, in that order. Ids that are not
+        # published recipes are listed in missing.
+        ids = self.get_list_param('ids')
+
+        if not all(recipe_id.isdecimal() for recipe_id in ids) or not (
+            0 < len(ids) <= API_BATCH_MAX_IDS
+        ):
+            raise ValidationError({'ids': [
+                f'Expected a comma-separated list of 1 to '
+                f'{API_BATCH_MAX_IDS} recipe ids.'
+            ]})
+
+        ids = list(dict.fromkeys(int(recipe_id) for recipe_id in ids))
+        fields = self.get_fields()
+        expand = self.get_expand()
+        # in_bulk() for values() rows
+        rows = {
+            row['id']: row for row in RecipeReadSerializer.project(
+                self.get_queryset().filter(pk__in=ids), fields, expand
+            )
+        }
+        data = RecipeReadSerializer(
+            [rows[recipe_id] for recipe_id in ids if recipe_id in rows],
+            request,
+            fields,
+            expand,
+        ).data
+
+        return Response({
+            'results': data,
+            'missing': [recipe_id for recipe_id in ids if recipe_id not in rows],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk', url_name='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        # All or nothing: with any invalid recipe nothing is created and the
+        # response lists the errors of each recipe, {} for the valid ones
+        items = request.data
+
+        if not isinstance(items, list) or not (
+            0 < len(items) <= API_BULK_MAX_RECIPES
+        ):
+            raise ValidationError({'non_field_errors': [
+                f'Expected a list of 1 to {API_BULK_MAX_RECIPES} recipes.'
+            ]})
+
+        context = self.get_serializer_context()
+        item_serializers = [
+            RecipeBulkItemSerializer(data=item, context=context)
+            for item in items
+        ]
+        errors = [
+            {} if serializer.is_valid() else dict(serializer.errors)
+            for serializer in item_serializers
+        ]
+        validated = [
+            serializer.validated_data for serializer in item_serializers
+        ]
+        titles = [
+            fold_text(data['title']) if data else None for data in validated
+        ]
+        taken_titles = get_taken_titles(filter(None, titles))
+        tag_ids = get_existing_tag_ids(
+            tag_id for data in validated for tag_id in data.get('tags', [])
+        )
+        seen_titles = set()
+
+        for index, (data, title) in enumerate(zip(validated, titles)):
+            if errors[index]:
+                continue
+
+            if title in taken_titles or title in seen_titles:
+                errors[index].setdefault('title', []).append(
+                    DUPLICATE_TITLE_ERROR
+                )
+
+            seen_titles.add(title)
+            missing_tags = [
+                tag_id for tag_id in data.get('tags', [])
+                if tag_id not in tag_ids
+            ]
+
+            if missing_tags:
+                errors[index]['tags'] = [
+                    f'Invalid pk "{tag_id}" - object does not exist.'
+                    for tag_id in missing_tags
+                ]
+
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        recipes = bulk_create_recipes(
+            [
+                Recipe(
+                    **{
+                        field: value for field, value in data.items()
+                        if field != 'tags'
+                    },
+                    author=request.user,
+                )
+                for data in validated
+            ],
+            [data.get('tags', []) for data in validated],
+        )
+        rows = RecipeReadSerializer.project(Recipe.objects.filter(
+            pk__in=[recipe.pk for recipe in recipes]
+        ).order_by('id'))
+
+        return Response(
+            RecipeReadSerializer(rows, request).data,
+            status=status.HTTP_201_CREATED
+        )
+
     def partial_update(self, request, *args, **kwargs):
         recipe = self.get_object()
         serializer = RecipeSerializer(
@@ -1,30 +1,44 @@
 import os
 
-from django.db.models import Q
-from django.db.models.aggregates import Count
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.http import Http404
 from django.shortcuts import render
 from django.utils import translation
 from django.utils.translation import gettext as _
 from django.views.generic import ListView, DetailView
-from utils.pagination import  make_pagination
+from utils.pagination import  make_pagination, make_keyset_pagination
+from utils.streaming import iter_json_array, iter_ndjson
 from django.forms.models import model_to_dict
 
-from tag.models import Tag
+from recipes.cache import CachedResponseMixin
+from recipes.catalog import get_catalog
+from recipes.counts import get_capped_count, get_published_count
+from recipes.conditional import (
+    ConditionalGetMixin,
+    recipe_etag,
+    recipe_last_modified,
+    recipe_list_etag,
+    recipe_page_etag,
+    recipe_page_last_modified,
+)
+from recipes.loaders import get_recipe_loader
 from recipes.models import Recipe
+from recipes.search import search_recipes
+from recipes.suggest import SUGGEST_LIMIT, SUGGEST_MAX_LIMIT, get_suggestions
 
 
 PER_PAGE = int(os.environ.get('PER_PAGE', 6))
+PAGINATION_MODE = os.environ.get('PAGINATION_MODE', 'page')
+SEARCH_COUNT_CAP = int(os.environ.get('SEARCH_COUNT_CAP', 1000))
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 500))
 
 
 def theory(request, *args, **kwargs):
     recipes = Recipe.objects.get_published()
-    number_of_recipes = recipes.aggregate(number=Count('id'))
 
     context = {
         'recipes': recipes,
-        'number_of_recipes': number_of_recipes['number']
+        'number_of_recipes': get_published_count('home')
     }
 
     return render(
@@ -34,25 +48,63 @@ def theory(request, *args, **kwargs):
     )
 
 
+def suggest(request, *args, **kwargs):
+    search_term = request.GET.get('q', '').strip()
+
+    try:
+        limit = int(request.GET.get('limit', SUGGEST_LIMIT))
+    except ValueError:
+        limit = SUGGEST_LIMIT
+
+    limit = min(max(limit, 1), SUGGEST_MAX_LIMIT)
+
+    return JsonResponse({
+        'query': search_term,
+        'results': get_suggestions(search_term, limit),
+    })
+
+
 class RecipeListViewBase(ListView):
     model = Recipe
     context_object_name = 'recipes'
     ordering = ['-id']
+    allow_keyset_pagination = True
 
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
         qs = qs.filter(is_published=True)
-        qs = qs.select_related('author', 'category')
-        qs = qs.prefetch_related('author__profile')
+        qs = qs.select_related('author', 'author__profile', 'category')
         return qs
+
+    def uses_keyset_pagination(self):
+        if not self.allow_keyset_pagination:
+            return False
+
+        return PAGINATION_MODE == 'keyset' or any(
+            cursor in self.request.GET for cursor in ('after', 'before')
+        )
+
+    def get_result_count(self, queryset):
+        # None lets the paginator count the queryset
+        return None
     
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
-        page_obj, pagination = make_pagination(
-            self.request, 
-            ctx.get('recipes'), 
-            PER_PAGE
-        )
+
+        if self.uses_keyset_pagination():
+            page_obj, pagination = make_keyset_pagination(
+                self.request,
+                ctx.get('recipes'),
+                PER_PAGE
+            )
+        else:
+            page_obj, pagination = make_pagination(
+                self.request, 
+                ctx.get('recipes'), 
+                PER_PAGE,
+                count=self.get_result_count(ctx.get('recipes')),
+            )
+
         html_language = translation.get_language()
         ctx.update(
             {
@@ -64,63 +116,157 @@ class RecipeListViewBase(ListView):
         return ctx
 
 
-class RecipeListViewHome(RecipeListViewBase):
+class RecipeListViewHome(CachedResponseMixin, RecipeListViewBase):
     template_name = 'recipes/pages/home.html'
 
+    def get_cache_group(self):
+        return 'home'
+
+    def get_result_count(self, queryset):
+        return get_published_count('home')
+
 
-class RecipeListViewHomeApi(RecipeListViewBase):
+class RecipeListViewHomeApi(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    RecipeListViewBase
+):
     template_name = 'recipes/pages/home.html'
+    etag_func = staticmethod(recipe_list_etag)
+    stream_formats = {
+        'ndjson': (iter_ndjson, 'application/x-ndjson'),
+        'json': (iter_json_array, 'application/json'),
+    }
+    stream_fields = (
+        'id', 'title', 'description', 'slug', 'preparation_time',
+        'preparation_time_unit', 'servings', 'servings_unit', 'created_at',
+        'updated_at', 'cover', 'category_id', 'author_id',
+    )
+    # The public columns of the list, internal ones stay out of it
+    api_fields = (
+        'id', 'title', 'description', 'slug', 'preparation_time',
+        'preparation_time_unit', 'servings', 'servings_unit',
+        'preparation_steps', 'preparation_steps_is_html', 'created_at',
+        'updated_at', 'is_published', 'cover', 'category_id', 'author_id',
+    )
+
+    def get_cache_group(self):
+        return 'home'
+
+    def get_result_count(self, queryset):
+        return get_published_count('home')
+
+    def get(self, request, *args, **kwargs):
+        stream_format = request.GET.get('stream', '')
+
+        if stream_format not in self.stream_formats:
+            return super().get(request, *args, **kwargs)
+
+        # Every published recipe, streamed without pagination or counting
+        iter_rows, content_type = self.stream_formats[stream_format]
+        rows = Recipe.objects.filter(
+            is_published=True
+        ).order_by('-id').values(
+            *self.stream_fields
+        ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+        return StreamingHttpResponse(
+            iter_rows(rows, batch_size=STREAM_CHUNK_SIZE),
+            content_type=content_type,
+        )
 
     def render_to_response(self, context, **response_kwargs):
-        recipes = self.get_context_data()['recipes'].object_list.values()
+        recipes = context['recipes'].object_list
+
+        if not hasattr(recipes, 'values'):
+            recipes = Recipe.objects.filter(
+                pk__in=[recipe.pk for recipe in recipes]
+            ).order_by('-id')
+
         return JsonResponse(
-            list(recipes),
+            list(recipes.values(*self.api_fields)),
             safe=False
         )
 
 
-class RecipeListViewCategory(RecipeListViewBase):
+class RecipeListViewCategory(CachedResponseMixin, RecipeListViewBase):
     template_name = 'recipes/pages/category.html'
 
+    def get_cache_group(self):
+        return f'category:{self.kwargs.get("category_id")}'
+
+    def get_result_count(self, queryset):
+        count = get_published_count(f'category:{self.kwargs.get("category_id")}')
+        # A counter that drifted to 0 would hide the recipes, the paginator
+        # counts them itself then
+        return count if count > 0 else None
+
     def get_queryset(self, *args, **kwargs):
+        category_id = self.kwargs.get('category_id')
+
+        if category_id not in get_catalog().categories:
+            raise Http404()
+
         qs = super().get_queryset(*args, **kwargs)
         qs = qs.filter(
-            category__id=self.kwargs.get('category_id'),
+            category_id=category_id,
         )
 
-        if not qs:
-            raise Http404()
-
         return qs
     
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
+
+        # Decided from the recipes, not from the cached counter
+        if not len(ctx['recipes']) and not self.object_list.exists():
+            raise Http404()
+
         category_translation = _('Category')
+        category_name = get_catalog().categories[self.kwargs.get('category_id')]
 
         ctx.update(
             {
-                'title': f'{ctx.get('recipes')[0].category.name} - {category_translation} | ',
+                'title': f'{category_name} - {category_translation} | ',
             }
         )
         return ctx
     
 
-class RecipeListViewTag(RecipeListViewBase):
+class RecipeListViewTag(CachedResponseMixin, RecipeListViewBase):
     template_name = 'recipes/pages/tag.html'
 
+    def get_cache_group(self):
+        return f'tag:{self.kwargs.get("slug", "")}'
+
+    def get_tag(self):
+        # (id, name) of the tag, or None
+        return get_catalog().tags.get(self.kwargs.get('slug', ''))
+
     def get_queryset(self, *args, **kwargs):
         qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(tags__slug=self.kwargs.get('slug', ''))
+        tag = self.get_tag()
+
+        if tag is None:
+            return qs.none()
+
+        qs = qs.filter(tags__id=tag[0])
         return qs
 
+    def get_result_count(self, queryset):
+        tag = self.get_tag()
+
+        if tag is None:
+            return 0
+
+        return get_published_count(f'tag:{tag[0]}')
+
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
-        page_title = Tag.objects.filter(
-            slug=self.kwargs.get('slug', '')
-        ).first()
+        tag = self.get_tag()
+        page_title = 'No recipes found'
 
-        if not page_title:
-            page_title = 'No recipes found'
+        if tag is not None:
+            page_title = tag[1]
 
         page_title = f'{page_title} - Tag |'
 
@@ -133,6 +279,8 @@ class RecipeListViewTag(RecipeListViewBase):
 
 class RecipeListViewSearch(RecipeListViewBase):
     template_name = 'recipes/pages/search.html'
+    # Results are ordered by relevance, not by id
+    allow_keyset_pagination = False
     
     def get_queryset(self, *args, **kwargs):
         search_term = self.request.GET.get('q', '').strip()
@@ -141,47 +289,67 @@ class RecipeListViewSearch(RecipeListViewBase):
             raise Http404()
             
         qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(
-            Q(
-                Q(title__icontains=search_term) |
-                Q(description__icontains=search_term)
-            ),
-        )
+        qs = search_recipes(qs, search_term)
 
         return qs
+
+    def get_result_count(self, queryset):
+        # Exact counts of broad searches cost a full scan of the matches.
+        # Counting goes on up to the requested page, so pages past the cap
+        # still exist and know whether another one follows.
+        try:
+            page_number = int(self.request.GET.get('page', 1))
+        except ValueError:
+            page_number = 1
+
+        self.search_count = get_capped_count(
+            queryset, max(SEARCH_COUNT_CAP, page_number * PER_PAGE)
+        )
+        return self.search_count
     
     def get_context_data(self, *args, **kwargs):
         search_term = self.request.GET.get('q', '').strip()
         ctx = super().get_context_data(*args, **kwargs)
+        search_count_label = str(self.search_count)
+
+        if self.search_count > SEARCH_COUNT_CAP:
+            search_count_label = f'{SEARCH_COUNT_CAP}+'
+
         ctx.update(
             {
                 'page_title': f'Search for "{search_term}" | ',
                 'search_term': search_term,
+                'search_count_label': search_count_label,
                 'additional_url_query': f'&q={search_term}',
             }
         )
         return ctx
 
 
-class RecipeDetail(DetailView):
+class RecipeDetail(CachedResponseMixin, ConditionalGetMixin, DetailView):
     model = Recipe
     context_object_name = 'recipe'
     template_name = 'recipes/pages/recipe-view.html'
+    etag_func = staticmethod(recipe_page_etag)
+    last_modified_func = staticmethod(recipe_page_last_modified)
 
-    def get_queryset(self, *args, **kwargs):
-        qs = super().get_queryset(*args, **kwargs)
-        qs = qs.filter(
-            pk=self.kwargs.get('pk'),
-            is_published=True,
+    def get_cache_group(self):
+        return f'recipe:{self.kwargs.get("pk")}'
+
+    def get_object(self, queryset=None):
+        recipe = get_recipe_loader(self.request).get_published_recipe(
+            self.kwargs.get('pk')
         )
 
-        return qs
-    
+        if recipe is None:
+            raise Http404()
+
+        return recipe
+
     def get_context_data(self, *args, **kwargs):
         ctx = super().get_context_data(*args, **kwargs)
         ctx.update(
             {
-                'recipe': self.get_object(),
                 'is_detail_page': True,
             }
         )
@@ -189,12 +357,16 @@ class RecipeDetail(DetailView):
     
 
 class RecipeDetailApi(RecipeDetail):
+    etag_func = staticmethod(recipe_etag)
+    last_modified_func = staticmethod(recipe_last_modified)
+
     def render_to_response(self, context, **response_kwargs):
-        recipe = self.get_context_data()['recipe']
+        recipe = context['recipe']
         recipe_dict = model_to_dict(recipe)
 
         recipe_dict['creted_at'] = recipe.created_at
         recipe_dict['updated_at'] = recipe.updated_at
+        recipe_dict['tags'] = [tag.id for tag in recipe_dict['tags']]
 
         if recipe_dict.get('cover'):
             recipe_dict['cover'] = self.request.build_absolute_uri() + recipe_dict['cover'].url[1:]
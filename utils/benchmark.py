@@ -0,0 +1,97 @@
+import math
+from contextlib import contextmanager
+from statistics import mean
+from time import perf_counter
+
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+
+def percentile(ordered_values, percent):
+    if not ordered_values:
+        return 0.0
+    index = math.ceil(percent / 100 * len(ordered_values)) - 1
+    return ordered_values[max(index, 0)]
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'runs': len(ordered),
+        'min': round(ordered[0], 3),
+        'mean': round(mean(ordered), 3),
+        'p50': round(percentile(ordered, 50), 3),
+        'p95': round(percentile(ordered, 95), 3),
+        'p99': round(percentile(ordered, 99), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def measure(func, repeat=20, warmup=2):
+    for _ in range(warmup):
+        func()
+
+    timings = []
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(repeat):
+            start = perf_counter()
+            func()
+            timings.append((perf_counter() - start) * 1000)
+
+    result = summarize(timings)
+    result['queries'] = round(len(queries) / repeat, 1)
+    return result
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    # Runs the benchmark against a throwaway test database, the same way
+    # the test runner does, so the real database is never touched.
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(
+        verbosity=verbosity,
+        autoclobber=True,
+        serialize=False,
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def compare_results(results, baseline, threshold=20, metric='p50', min_delta=0.5):
+    # Lists the endpoints slower than the baseline by more than `threshold`
+    # percent (and `min_delta` ms), or that now run more queries.
+    regressions = []
+
+    for size, endpoints in results.items():
+        for name, result in endpoints.items():
+            previous = baseline.get(size, {}).get(name)
+
+            if previous is None:
+                continue
+
+            current_value = result[metric]
+            previous_value = previous[metric]
+            limit = previous_value * (1 + threshold / 100)
+
+            if current_value > limit and current_value - previous_value > min_delta:
+                regressions.append(
+                    f'{size} {name}: {metric} {previous_value}ms -> '
+                    f'{current_value}ms'
+                )
+
+            if result['queries'] > previous['queries']:
+                regressions.append(
+                    f'{size} {name}: queries {previous["queries"]} -> '
+                    f'{result["queries"]}'
+                )
+
+    return regressions
@@ -0,0 +1,87 @@
+from copy import deepcopy
+
+from django.db.models.fields.files import FieldFile
+
+
+def _comparable(value):
+    # Files are stored by name, the instance holds a FieldFile
+    if isinstance(value, FieldFile):
+        return value.name
+    return value
+
+
+class DirtyFieldsMixin:
+    # Snapshots the values loaded from the database, so saves and signals can
+    # tell what changed without reading the row again
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def _snapshot(self, attnames=None):
+        loaded = getattr(self, '_loaded_values', {})
+
+        for field in self._meta.concrete_fields:
+            if attnames is not None and field.attname not in attnames:
+                continue
+
+            # Deferred fields are not loaded, so they cannot have changed
+            if field.attname in self.__dict__:
+                value = _comparable(self.__dict__[field.attname])
+                loaded[field.attname] = deepcopy(value) if isinstance(
+                    value, (dict, list)
+                ) else value
+
+        self._loaded_values = loaded
+
+    def get_loaded_value(self, attname, default=None):
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    @property
+    def changed_fields(self):
+        loaded = getattr(self, '_loaded_values', None)
+
+        # Nothing was loaded, every field is new
+        if loaded is None:
+            return {
+                field.attname for field in self._meta.concrete_fields
+                if field.attname in self.__dict__
+            }
+
+        # auto_now fields are set by every save, they are not a change
+        auto_now = {
+            field.attname for field in self._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        }
+
+        return {
+            attname for attname, value in loaded.items()
+            if attname not in auto_now
+            and _comparable(self.__dict__.get(attname, value)) != value
+        }
+
+    def _get_attnames(self, names):
+        if names is None:
+            return None
+        return {self._meta.get_field(name).attname for name in names}
+
+    def save(self, *args, **kwargs):
+        if not hasattr(self, '_loaded_values') and self.pk is not None:
+            # Built by hand with the pk of an existing row, read it once
+            loaded = type(self)._base_manager.filter(pk=self.pk).values(
+                *(field.attname for field in self._meta.concrete_fields)
+            ).first()
+
+            if loaded is not None:
+                self._loaded_values = loaded
+
+        saved = super().save(*args, **kwargs)
+        self._snapshot(self._get_attnames(kwargs.get('update_fields')))
+        return saved
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        refreshed = super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(self._get_attnames(fields))
+        return refreshed
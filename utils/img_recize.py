@@ -1,18 +1,192 @@
-from pathlib import Path
+import os
+from base64 import b64encode
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path, PurePosixPath
 from django.conf import settings
-from PIL import Image
+from PIL import Image, ImageFilter, ImageOps, UnidentifiedImageError
+
+COVER_WIDTHS = (320, 640, 840, 1280)
+FALLBACK_WIDTH = 840
+PLACEHOLDER_WIDTH = 24
+EXIF_ORIENTATION = 0x0112
+REDUCIBLE_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+
+class InvalidImage(ValueError):
+    # Missing, not an image or broken, reading it again cannot work
+    ...
+
+
+class ImageTooLarge(InvalidImage):
+    ...
+
+
+def _media_path(name):
+    return Path(settings.MEDIA_ROOT / name).resolve()
+
+
+@contextmanager
+def open_image(image_path, max_width=None):
+    # Checks the byte and pixel limits from the header, before any pixel is
+    # decoded. With max_width, JPEGs are decoded straight to the smallest
+    # 1/2, 1/4 or 1/8 scale that is still at least that wide once rotated,
+    # other formats are reduced right after decoding.
+    # Yields the image and the decoded/original scale.
+    try:
+        size = os.path.getsize(image_path)
+    except FileNotFoundError as error:
+        raise InvalidImage(str(error)) from error
+
+    if size > settings.COVER_MAX_BYTES:
+        raise ImageTooLarge(
+            f'{image_path} is over {settings.COVER_MAX_BYTES} bytes'
+        )
+
+    try:
+        image_file = Image.open(image_path)
+    except Image.DecompressionBombError as error:
+        # Pillow refuses headers over twice Image.MAX_IMAGE_PIXELS itself
+        raise ImageTooLarge(str(error)) from error
+    except UnidentifiedImageError as error:
+        raise InvalidImage(str(error)) from error
+
+    with image_file as image_pillow:
+        width, height = image_pillow.size
+
+        if width * height > settings.COVER_MAX_PIXELS:
+            raise ImageTooLarge(
+                f'{image_path} is {width}x{height}, over '
+                f'{settings.COVER_MAX_PIXELS} pixels'
+            )
+
+        if max_width is not None:
+            # EXIF orientations 5 to 8 swap width and height
+            rotated = image_pillow.getexif().get(EXIF_ORIENTATION, 1) >= 5
+            shown_width = height if rotated else width
+
+            if max_width < shown_width:
+                draft_size = (
+                    round(max_width * width / shown_width),
+                    round(max_width * height / shown_width),
+                )
+                image_pillow.draft('RGB', draft_size)
+
+        _decode(image_pillow, image_path)
+
+        if max_width is not None:
+            # Formats without draft support are decoded in full, then
+            # box-reduced once so the copies made afterwards are small
+            factor = shown_width * image_pillow.size[0] // width // max_width
+
+            if factor >= 2 and image_pillow.mode in REDUCIBLE_MODES:
+                with image_pillow.reduce(factor) as reduced:
+                    yield reduced, reduced.size[0] / width
+                return
+
+        yield image_pillow, image_pillow.size[0] / width
+
+
+def _decode(image_pillow, image_path):
+    try:
+        image_pillow.load()
+    except OSError as error:
+        # Broken data fails in the decoder, without an errno. Errors of the
+        # disk have one and are raised as they are.
+        if error.errno is not None:
+            raise
+        raise InvalidImage(
+            f'{image_path} cannot be decoded: {error}'
+        ) from error
+
+
+def _resized(image_pillow, width):
+    height = max(round(width * image_pillow.height / image_pillow.width), 1)
+    # reducing_gap box-reduces large images before the LANCZOS pass
+    return image_pillow.resize(
+        (width, height), Image.LANCZOS, reducing_gap=3.0
+    )
+
 
 def img_recize(image_django, new_width=840, optimize=True, quality=70):
-    image_path  = Path(settings.MEDIA_ROOT / image_django.name).resolve()
-    image_pillow = Image.open(image_path)
-    original_width, original_height = image_pillow.size
-
-    if original_width <= new_width:
-        image_pillow.close()
-        return image_django
-    
-    new_height = round(new_width * original_height / original_width)
-    new_image = image_pillow.resize((new_width, new_height), Image.LANCZOS)
+    image_path  = _media_path(image_django.name)
+
+    with open_image(image_path, max_width=new_width) as (image_pillow, scale):
+        if image_pillow.width / scale <= new_width:
+            return image_django
+
+        new_image = _resized(image_pillow, new_width)
+
     new_image.save(image_path, optimize=optimize, quality=quality)
 
     return new_image
+
+
+def get_variant_name(name, width, extension):
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}_{width}w.{extension}'))
+
+
+def get_variant_names(manifest):
+    variants = [*manifest.get('webp', []), manifest.get('fallback')]
+    return [variant['name'] for variant in variants if variant]
+
+
+def _save_variant(image_pillow, width, name, *args, **kwargs):
+    with _resized(image_pillow, width) as variant:
+        variant.save(_media_path(name), *args, **kwargs)
+        return {'name': name, 'width': variant.width, 'height': variant.height}
+
+
+def make_cover_variants(
+        image_django,
+        widths=COVER_WIDTHS,
+        fallback_width=FALLBACK_WIDTH,
+        quality=70,
+        fast_decode=True
+    ):
+    # Writes WebP variants next to the original, one per width up to the
+    # original width, a JPEG fallback and an inline blurred placeholder.
+    # Returns the manifest stored in Recipe.cover_variants.
+    max_width = max(*widths, fallback_width) if fast_decode else None
+
+    image_path = _media_path(image_django.name)
+
+    with open_image(image_path, max_width) as (original, scale):
+        with ImageOps.exif_transpose(original) as transposed:
+            image_pillow = transposed.convert('RGB')
+
+    with image_pillow:
+        # Widths are relative to the original, not to the draft decode
+        original_width = round(image_pillow.width / scale)
+        manifest = {'webp': [], 'fallback': None, 'placeholder': ''}
+
+        for width in sorted({min(width, original_width) for width in widths}):
+            manifest['webp'].append(_save_variant(
+                image_pillow,
+                min(width, image_pillow.width),
+                get_variant_name(image_django.name, width, 'webp'),
+                'WEBP', quality=quality, method=4,
+            ))
+
+        width = min(fallback_width, original_width)
+        manifest['fallback'] = _save_variant(
+            image_pillow,
+            min(width, image_pillow.width),
+            get_variant_name(image_django.name, width, 'jpg'),
+            'JPEG', optimize=True, quality=quality,
+        )
+
+        with _resized(image_pillow, PLACEHOLDER_WIDTH) as small:
+            placeholder = small.filter(ImageFilter.GaussianBlur(2))
+
+    placeholder_bytes = BytesIO()
+
+    with placeholder:
+        placeholder.save(placeholder_bytes, 'JPEG', quality=40)
+
+    manifest['placeholder'] = 'data:image/jpeg;base64,' + b64encode(
+        placeholder_bytes.getvalue()
+    ).decode('ascii')
+
+    return manifest
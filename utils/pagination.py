@@ -1,5 +1,7 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from django.core.paginator import Paginator, EmptyPage
 from django.http import Http404
+from django.utils.functional import cached_property
 
 import math
 
@@ -31,9 +33,23 @@ def make_pagination_range(page_range, qty_pages, current_page):
         'last_page_out_of_range': stop_range < total_pages,
     }
 
-def make_pagination(request, quetyset, per_page, qty_pages=4):
+
+class CountedPaginator(Paginator):
+    # Paginator that trusts a count it was given instead of running COUNT(*)
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        return super().count
+
+
+def make_pagination(request, quetyset, per_page, qty_pages=4, count=None):
     page_number = int(request.GET.get('page', 1))
-    paginator = Paginator(quetyset, per_page)
+    paginator = CountedPaginator(quetyset, per_page, count=count)
     try:
         page_obj = paginator.page(page_number)
     except EmptyPage:
@@ -45,4 +61,92 @@ def make_pagination(request, quetyset, per_page, qty_pages=4):
         page_number
     )
 
-    return page_obj, pagination
\ No newline at end of file
+    return page_obj, pagination
+
+
+def encode_cursor(value):
+    return urlsafe_b64encode(str(value).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        return int(urlsafe_b64decode(cursor + padding).decode())
+    except ValueError:
+        raise Http404()
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, key='id'):
+        self.object_list = object_list
+        self.key = key
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return ''
+        return encode_cursor(getattr(self.object_list[-1], self.key))
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return ''
+        return encode_cursor(getattr(self.object_list[0], self.key))
+
+
+def make_keyset_pagination(request, queryset, per_page, key='id'):
+    # Seek pagination: no COUNT(*) and no OFFSET, one extra row tells us
+    # whether there is a next page.
+    after = request.GET.get('after', '')
+    before = request.GET.get('before', '')
+    queryset = queryset.order_by(f'-{key}')
+
+    if before:
+        rows = list(
+            queryset.filter(
+                **{f'{key}__gt': decode_cursor(before)}
+            ).order_by(key)[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after:
+            queryset = queryset.filter(**{f'{key}__lt': decode_cursor(after)})
+
+        rows = list(queryset[:per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = bool(after)
+
+    page_obj = KeysetPage(rows, has_next, has_previous, key=key)
+    pagination = {
+        'keyset': True,
+        'next_cursor': page_obj.next_cursor,
+        'previous_cursor': page_obj.previous_cursor,
+    }
+
+    return page_obj, pagination
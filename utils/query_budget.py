@@ -0,0 +1,171 @@
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+THIS_FILE = str(Path(__file__).resolve())
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    # Same shape for queries that only differ by their parameters
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def get_call_site():
+    # Innermost frame that belongs to this project and not to a library
+    frame = sys._getframe(1)
+
+    while frame is not None:
+        filename = frame.f_code.co_filename
+
+        if (
+            filename.startswith(PROJECT_DIR)
+            and filename != THIS_FILE
+            and 'site-packages' not in filename
+        ):
+            relative = filename[len(PROJECT_DIR):].lstrip('/\\')
+            return f'{relative}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+        frame = frame.f_back
+
+    return 'unknown'
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'shape': normalize_sql(sql),
+                'call_site': get_call_site(),
+                'duration': time.perf_counter() - start,
+            })
+
+    def __len__(self):
+        return len(self.queries)
+
+    def get_groups(self):
+        return Counter(
+            (query['shape'], query['call_site']) for query in self.queries
+        )
+
+    def get_repeated(self, threshold=None):
+        if threshold is None:
+            threshold = settings.QUERY_BUDGET_REPEAT_THRESHOLD
+
+        return [
+            (shape, call_site, count)
+            for (shape, call_site), count in self.get_groups().most_common()
+            if count >= threshold
+        ]
+
+    def get_report(self, threshold=None):
+        lines = [f'{len(self)} queries']
+
+        for shape, call_site, count in self.get_repeated(threshold):
+            lines.append(f'  {count}x at {call_site}: {shape}')
+
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+
+    with connection.execute_wrapper(recorder):
+        yield recorder
+
+
+def get_query_budget(url_name):
+    return settings.QUERY_BUDGETS.get(url_name)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Streaming bodies run their queries after this returns
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        url_name = match.view_name if match is not None else None
+        budget = get_query_budget(url_name)
+        repeated = recorder.get_repeated()
+
+        response['X-Query-Count'] = str(len(recorder))
+
+        if budget is not None:
+            response['X-Query-Budget'] = str(budget)
+
+            if len(recorder) > budget:
+                logger.warning(
+                    'Query budget exceeded for %s: %s > %s\n%s',
+                    url_name, len(recorder), budget, recorder.get_report()
+                )
+
+        if repeated:
+            # Call sites show the source tree, only sent while debugging
+            if settings.DEBUG:
+                response['X-Query-Repeated'] = '; '.join(
+                    f'{count}x {call_site}' for _, call_site, count in repeated
+                )
+            logger.warning(
+                'Repeated queries for %s\n%s', url_name, recorder.get_report()
+            )
+
+        return response
+
+
+class QueryBudgetTestMixin:
+    @contextmanager
+    def assertQueryBudget(self, url_name, budget=None):
+        if budget is None:
+            budget = get_query_budget(url_name)
+
+        with record_queries() as recorder:
+            yield recorder
+
+        if budget is not None and len(recorder) > budget:
+            self.fail(
+                f'{url_name} used {len(recorder)} queries, '
+                f'budget is {budget}\n{recorder.get_report(threshold=1)}'
+            )
+
+    @contextmanager
+    def assertNoRepeatedQueries(self, threshold=None):
+        with record_queries() as recorder:
+            yield recorder
+
+        if recorder.get_repeated(threshold):
+            self.fail(f'Repeated queries\n{recorder.get_report(threshold)}')
@@ -0,0 +1,41 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def _encode(row):
+    return json.dumps(row, cls=DjangoJSONEncoder)
+
+
+def iter_ndjson(rows, batch_size=500):
+    # One JSON document per line, written in batches of batch_size rows
+    batch = []
+
+    for row in rows:
+        batch.append(_encode(row))
+
+        if len(batch) >= batch_size:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+
+    if batch:
+        yield '\n'.join(batch) + '\n'
+
+
+def iter_json_array(rows, batch_size=500):
+    yield '['
+    separator = ''
+    batch = []
+
+    for row in rows:
+        batch.append(_encode(row))
+
+        if len(batch) >= batch_size:
+            yield separator + ','.join(batch)
+            separator = ','
+            batch = []
+
+    if batch:
+        yield separator + ','.join(batch)
+
+    yield ']'
@@ -1,6 +1,18 @@
+import unicodedata
+
+
 def is_positive_number(value):
     try:
         number_string = float(value)
     except (ValueError, TypeError):
         return False
-    return number_string > 0
\ No newline at end of file
+    return number_string > 0
+
+
+def fold_text(value):
+    # Case, accent and whitespace insensitive form of a text
+    decomposed = unicodedata.normalize('NFKD', str(value or ''))
+    without_accents = ''.join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return ' '.join(without_accents.casefold().split())